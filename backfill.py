@@ -0,0 +1,150 @@
+"""Streaming reader and checkpoint for backfilling from tweet archives.
+
+Accepted inputs, all read incrementally with ``JSONDecoder.raw_decode``
+so memory stays flat however large the file is:
+
+* an X archive ``tweets.js`` (``window.YTD.tweets.part0 = [ ... ]``)
+* a JSON array, e.g. a large manual_tweets.json
+* JSONL or concatenated JSON objects
+
+Records can be archive entries (``{"tweet": {...}}``), syndication
+tweets (``id_str``/``full_text``/``quoted_status``) or manual tweets
+(``id``/``text``/``quoted_text``/``url``).
+
+The checkpoint remembers how many records of which file have been fully
+handled, so an interrupted backfill resumes after the last finished
+batch; the processed store catches anything published in between.
+"""
+import json
+import os
+import re
+
+CHUNK_SIZE = 1 << 16
+CHECKPOINT_FILE = 'backfill_state.json'
+
+_decoder = json.JSONDecoder()
+_space = re.compile(r'[\s,]*')
+STATUS_URL = re.compile(r'https?://(?:mobile\.)?(?:twitter|x)\.com/\w+/status(?:es)?/\d+')
+
+
+def iter_records(f, chunk_size=CHUNK_SIZE):
+    """Yield top-level JSON values from a text stream; the elements of a
+    top-level array are yielded one by one"""
+    buffer, pos, eof = '', 0, False
+    in_array = None  # unknown until the first value
+
+    while True:
+        pos = _space.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                return
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+            continue
+
+        char = buffer[pos]
+        if in_array is None:
+            if char not in '[{':
+                # tweets.js: skip the "window.YTD.tweets.part0 =" assignment
+                equals = buffer.find('=', pos)
+                if equals < 0:
+                    raise ValueError("Not a JSON, JSONL or tweets.js file")
+                pos = equals + 1
+                continue
+            in_array = char == '['
+            pos += in_array
+            continue
+        if char in '];':
+            pos += 1
+            continue
+
+        try:
+            value, pos = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Most likely a value cut off at the end of the buffer
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            buffer, pos = buffer[pos:] + chunk, 0
+            eof = not chunk
+            continue
+        yield value
+
+
+def to_tweet(record, username, matches):
+    """Turn one archive/syndication/manual record into a pipeline tweet,
+    or None if it isn't a quote tweet ``matches`` accepts (a dict it
+    returns is merged into the tweet as extra fields)"""
+    if not isinstance(record, dict):
+        return None
+    record = record.get('tweet', record)
+    tweet_id = str(record.get('id_str') or record.get('id') or '')
+    text = record.get('full_text') or record.get('text') or ''
+    fields = matches(text) if tweet_id and text else None
+    if not fields:
+        return None
+
+    if 'quoted_text' in record:
+        # Manual entries are quote tweets by definition
+        quoted_text = record.get('quoted_text') or ''
+    elif record.get('quoted_status'):
+        quoted = record['quoted_status']
+        quoted_text = quoted.get('full_text', quoted.get('text', ''))
+    else:
+        # Archives only keep the link to the quoted tweet
+        urls = record.get('entities', {}).get('urls', [])
+        quoted = [u.get('expanded_url', '') for u in urls if STATUS_URL.match(u.get('expanded_url', ''))]
+        if not quoted:
+            return None
+        quoted_text = ''
+
+    tweet = {
+        'id': tweet_id,
+        'text': text,
+        'quoted_text': quoted_text,
+        'url': record.get('url') or f"https://x.com/{username}/status/{tweet_id}",
+    }
+    if isinstance(fields, dict):
+        tweet.update(fields)
+    return tweet
+
+
+class Checkpoint:
+    """Records handled so far for one input file"""
+
+    def __init__(self, source, path=CHECKPOINT_FILE):
+        self.path = path
+        stat = os.stat(source)
+        self.source = {'path': os.path.abspath(source), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+        self.records = 0
+        self.published = 0
+        self.failed = 0
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        # A different or modified file starts over (the processed store
+        # still keeps already published tweets from being redone)
+        if data.get('source') == self.source:
+            self.records = data.get('records', 0)
+            self.published = data.get('published', 0)
+            self.failed = data.get('failed', 0)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'source': self.source,
+                'records': self.records,
+                'published': self.published,
+                'failed': self.failed,
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.records = self.published = self.failed = 0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,177 @@
+"""End-to-end benchmark: bot.py against local fakes of every service.
+
+    python benchmarks/bench_e2e.py [--batches 10 100 1000] [--source syndication|rss]
+        [--publisher github-batch|github-contents|local] [--stream]
+        [--latency groq=0.5 github=0.1] [--error-rate duckduckgo=0.05]
+        [--tokens-per-second 1000] [--rate-limits]
+        [--quota github=100 groq=30] [--quota-window 60] [--accounts 1]
+
+Each batch runs ``bot.py`` once in a fresh temporary directory (cold
+caches, empty processed store) against a fake timeline of that many
+matching tweets, with MAX_TWEETS_PER_RUN raised so the whole batch is
+processed in one run. Provider rate limits are lifted unless
+``--rate-limits`` is given, so the numbers show the pipeline itself.
+``--quota`` makes the fake GitHub/Groq enforce a request quota per
+window and report it in rate-limit headers, to see how the bot paces
+itself against limits it only learns from the responses. ``--accounts``
+spreads the tweets over that many accounts, each with its own feed (and
+section) in a generated feeds.json.
+Other settings (RESEARCH_WORKERS, GENERATE_WORKERS, SITE_OUTPUT, ...)
+are passed through from the environment.
+
+Per stage the report shows calls, failures, service time percentiles and
+the window in which the stage was active, as seen by the fakes, followed
+by the bot's own timing spans from its run report; end to end it shows
+wall time, articles published per second and the time until each
+article landed in the repo.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import DEFAULT_PROFILES, SERVICES, FakeServices, Profile, Quota, make_tweets  # noqa: E402
+
+BOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bot.py')
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def parse_settings(pairs, option):
+    settings = {}
+    for pair in pairs or []:
+        service, _, value = pair.partition('=')
+        if service not in SERVICES or not value:
+            raise SystemExit(f"{option}: expected service=value with service in {', '.join(SERVICES)}")
+        settings[service] = float(value)
+    return settings
+
+
+def run_batch(count, args, profiles, quotas):
+    tweets = make_tweets(count, '#bench', seed=count)
+    if args.accounts > 1:
+        tweets = {f"bench{n}": tweets[n::args.accounts] for n in range(args.accounts)}
+    quotas = {service: Quota(int(limit), args.quota_window) for service, limit in quotas.items()}
+    with FakeServices(tweets, profiles=profiles, source=args.source,
+                      tokens_per_second=args.tokens_per_second, quotas=quotas) as services, \
+            tempfile.TemporaryDirectory(prefix='bench-e2e-') as workdir:
+        env = dict(os.environ)
+        env.update(services.env())
+        env.update({
+            'GROQ_API_KEY': 'bench',
+            'BLOG_GITHUB_TOKEN': 'bench',
+            'BLOG_GITHUB_USERNAME': 'bench',
+            'BLOG_REPO_NAME': 'blog',
+            'MAX_TWEETS_PER_RUN': str(count),
+            'PUBLISHER': args.publisher,
+            'LOCAL_SITE_DIR': os.path.join(workdir, 'site'),
+            'LOCAL_SITE_GIT': '1' if args.local_git else '',
+            'GROQ_STREAM': '1' if args.stream else '',
+        })
+        if args.accounts > 1:
+            with open(os.path.join(workdir, 'feeds.json'), 'w') as f:
+                json.dump([{'account': account, 'hashtags': ['#bench'], 'section': f"Section {account}"}
+                           for account in tweets], f)
+        if not args.rate_limits:
+            for provider in ('duckduckgo', 'groq', 'github'):
+                env[f"RATE_LIMIT_{provider.upper()}"] = '1000000'
+
+        started = time.monotonic() - services.started
+        started_wall = time.time()
+        with open(os.path.join(workdir, 'bot.log'), 'w') as log:
+            result = subprocess.run([sys.executable, BOT], cwd=workdir, env=env,
+                                    stdout=log, stderr=subprocess.STDOUT)
+        wall = time.monotonic() - services.started - started
+        if result.returncode != 0:
+            with open(os.path.join(workdir, 'bot.log')) as log:
+                print(log.read()[-2000:])
+            raise SystemExit(f"bot.py exited with {result.returncode}")
+
+        if args.publisher == 'local':
+            articles = os.path.join(workdir, 'site', 'articles')
+            landed = [os.path.getmtime(os.path.join(articles, name)) - started_wall
+                      for name in os.listdir(articles)] if os.path.isdir(articles) else []
+        else:
+            landed = [at - services.started - started for at in services.github.published_at.values()]
+        try:
+            with open(os.path.join(workdir, 'run_report.json')) as f:
+                run_report = json.load(f)
+        except FileNotFoundError:
+            run_report = None
+        return wall, landed, list(services.log), run_report
+
+
+def report(count, wall, landed, log, run_report):
+    published = len(landed)
+    print(f"\n=== {count} tweets: {wall:.2f}s wall, {published} published, "
+          f"{published / wall if wall else 0:.2f} articles/s ===")
+    if landed:
+        print(f"  time to publish  p50 {percentile(landed, 0.5):.2f}s  "
+              f"p95 {percentile(landed, 0.95):.2f}s  max {max(landed):.2f}s")
+    print(f"  {'stage':<12} {'calls':>6} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'active s':>9} {'calls/s':>8}")
+    for service in SERVICES:
+        calls = [entry for entry in log if entry['service'] == service]
+        if not calls:
+            continue
+        errors = sum(1 for entry in calls if entry['status'] >= 500 or entry['status'] in (403, 429))
+        durations = [entry['duration'] for entry in calls]
+        window = max(e['start'] + e['duration'] for e in calls) - min(e['start'] for e in calls)
+        print(f"  {service:<12} {len(calls):>6} {errors:>7} "
+              f"{percentile(durations, 0.5) * 1000:>8.1f} {percentile(durations, 0.95) * 1000:>8.1f} "
+              f"{window:>9.2f} {len(calls) / window if window else 0:>8.1f}")
+    if not run_report:
+        return
+    # The bot's own spans include queueing, retries and client-side work
+    print(f"  {'bot span':<18} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'total s':>8}")
+    for name, stats in run_report['spans'].items():
+        print(f"  {name:<18} {stats['count']:>6} {stats['p50'] * 1000:>8.1f} "
+              f"{stats['p95'] * 1000:>8.1f} {stats['total']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--batches', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--source', choices=('syndication', 'rss'), default='syndication')
+    parser.add_argument('--publisher', choices=('github-batch', 'github-contents', 'local'),
+                        default='github-batch')
+    parser.add_argument('--local-git', action='store_true',
+                        help='commit the local site to a git repo (with --publisher local)')
+    parser.add_argument('--stream', action='store_true', help='stream Groq completions')
+    parser.add_argument('--latency', nargs='*', metavar='SERVICE=SECONDS')
+    parser.add_argument('--error-rate', nargs='*', metavar='SERVICE=FRACTION')
+    parser.add_argument('--tokens-per-second', type=float, default=1000.0,
+                        help='fake Groq generation speed (0 = instant)')
+    parser.add_argument('--rate-limits', action='store_true',
+                        help='keep the bot\'s provider rate limits')
+    parser.add_argument('--quota', nargs='*', metavar='SERVICE=REQUESTS',
+                        help='requests per window the fake github/groq allow')
+    parser.add_argument('--quota-window', type=float, default=60.0, help='quota window in seconds')
+    parser.add_argument('--accounts', type=int, default=1, help='spread the tweets over this many feeds')
+    args = parser.parse_args()
+
+    latency = parse_settings(args.latency, '--latency')
+    error_rate = parse_settings(args.error_rate, '--error-rate')
+    quotas = parse_settings(args.quota, '--quota')
+    profiles = {
+        service: Profile(latency.get(service, default.latency), default.jitter,
+                         error_rate.get(service, default.error_rate))
+        for service, default in DEFAULT_PROFILES.items()
+    }
+
+    for count in args.batches:
+        report(count, *run_batch(count, args, profiles, quotas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Micro-benchmark: compiled matcher vs the substring hashtag check.
+
+    python benchmarks/bench_match.py [--tweets 10000 100000] [--rules 1 20 100] [--repeat 5]
+
+Timelines are synthetic tweets of ~40 words where about 1 in 10 carries
+one of the rule hashtags and about 1 in 20 a longer look-alike hashtag
+(``#budget`` vs ``#budgetcuts``). With N rules, the legacy check is the
+substring test repeated for each term, as a multi-hashtag version of
+``HASHTAG.lower() in text.lower()`` would be. The report also shows how
+many tweets each approach accepted; the difference is look-alikes the
+substring check lets through.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from matcher import Matcher, rules  # noqa: E402
+
+from fakes import WORDS  # noqa: E402
+
+
+def make_terms(count):
+    return [f"#{word}{n}" if n else f"#{word}" for n in range(count // len(WORDS) + 1)
+            for word in WORDS][:count]
+
+
+def make_timeline(count, terms, seed=0):
+    rng = random.Random(seed)
+    tweets = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(40)]
+        roll = rng.random()
+        if roll < 0.1:
+            words.insert(rng.randrange(40), rng.choice(terms).upper())
+        elif roll < 0.15:
+            words.insert(rng.randrange(40), rng.choice(terms) + 'cuts')
+        tweets.append(' '.join(words).capitalize() + '.')
+    return tweets
+
+
+def legacy_filter(tweets, terms):
+    lowered_terms = [term.lower() for term in terms]
+    return [text for text in tweets if any(term in text.lower() for term in lowered_terms)]
+
+
+def matcher_filter(tweets, compiled):
+    return [text for text in tweets if compiled.match(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tweets', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--rules', type=int, nargs='+', default=[1, 20, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'tweets':>7} {'rules':>6} {'check':<10} {'best ms':>9} {'tweets/s':>12} {'accepted':>9}")
+    for count in args.tweets:
+        for rule_count in args.rules:
+            terms = make_terms(rule_count)
+            tweets = make_timeline(count, terms, seed=count)
+            compiled = Matcher(rules(hashtags=terms, owner='bench'))
+            cases = [
+                ('substring', lambda: legacy_filter(tweets, terms)),
+                ('matcher', lambda: matcher_filter(tweets, compiled)),
+            ]
+            for name, fn in cases:
+                accepted = len(fn())
+                best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+                print(f"{count:>7} {rule_count:>6} {name:<10} {best * 1000:>9.2f} "
+                      f"{count / best:>12,.0f} {accepted:>9}")
+
+
+if __name__ == "__main__":
+    main()
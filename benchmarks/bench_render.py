@@ -0,0 +1,213 @@
+"""Throughput benchmark: renderer.render_article vs the original f-string renderer.
+
+    python benchmarks/bench_render.py [--articles 2000] [--repeat 3]
+
+Articles follow the format generate_article asks Groq for: a title line,
+four paragraphs with bold text and inline links, and a numbered
+reference list. Reports articles rendered per second and the average
+page size, including the compact output (shared stylesheet, minified HTML).
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import renderer  # noqa: E402
+
+BLOG_HOME = '/blog/'
+
+
+def legacy_create_article_html(article, tweet, blog_home):
+    """create_article_html as it was before renderer.py"""
+    lines = article.split('\n')
+    title_line = next(
+        (l for l in lines if l.strip().startswith('Title:')),
+        None
+    )
+
+    if title_line:
+        title = title_line.replace('Title:', '').strip()
+        idx = lines.index(title_line) + 1
+        content = '\n'.join(lines[idx:]).strip()
+    else:
+        title = f"Article: {tweet['text'][:60]}"
+        content = article
+
+    # Convert markdown to HTML
+    content = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', content)
+    content = re.sub(
+        r'\[([^\]]+)\]\(([^\)]+)\)',
+        r'<a href="\2" target="_blank">\1</a>',
+        content
+    )
+
+    paragraphs = content.split('\n\n')
+    html_paragraphs = ''.join(
+        f'<p>{p.strip().replace(chr(10), "<br>")}</p>\n'
+        for p in paragraphs if p.strip()
+    )
+
+    date_str = datetime.now().strftime('%B %d, %Y')
+
+    html = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        body {{
+            font-family: Georgia, 'Times New Roman', serif;
+            line-height: 1.8;
+            color: #333;
+            background: #fafafa;
+        }}
+        header {{
+            background: #1a1a2e;
+            color: white;
+            padding: 20px 40px;
+        }}
+        header a {{
+            color: #e0e0e0;
+            text-decoration: none;
+            font-size: 14px;
+        }}
+        header a:hover {{ color: white; }}
+        .article-container {{
+            max-width: 800px;
+            margin: 40px auto;
+            padding: 0 20px;
+        }}
+        .article-header {{
+            margin-bottom: 30px;
+            border-bottom: 3px solid #1a1a2e;
+            padding-bottom: 20px;
+        }}
+        h1 {{
+            font-size: 2em;
+            color: #1a1a2e;
+            line-height: 1.3;
+            margin-bottom: 10px;
+        }}
+        .meta {{
+            color: #888;
+            font-size: 14px;
+            font-family: Arial, sans-serif;
+        }}
+        .content p {{
+            margin-bottom: 20px;
+            font-size: 1.1em;
+        }}
+        .content a {{
+            color: #1a1a2e;
+        }}
+        .source-tweet {{
+            background: #f0f4ff;
+            border-left: 4px solid #1a1a2e;
+            padding: 15px 20px;
+            margin: 30px 0;
+            border-radius: 0 8px 8px 0;
+        }}
+        .source-tweet p {{
+            margin: 0;
+            font-size: 0.95em;
+        }}
+        .source-tweet a {{
+            color: #1a1a2e;
+            font-weight: bold;
+        }}
+        footer {{
+            text-align: center;
+            padding: 40px;
+            color: #888;
+            font-family: Arial, sans-serif;
+            font-size: 13px;
+            border-top: 1px solid #eee;
+            margin-top: 60px;
+        }}
+    </style>
+</head>
+<body>
+    <header>
+        <a href="{blog_home}">← Back to Home</a>
+    </header>
+
+    <div class="article-container">
+        <div class="article-header">
+            <h1>{title}</h1>
+            <p class="meta">Published on {date_str} • Auto-researched article</p>
+        </div>
+
+        <div class="content">
+            {html_paragraphs}
+        </div>
+
+        <div class="source-tweet">
+            <p>📌 <strong>Source Tweet:</strong> <a href="{tweet['url']}" target="_blank">{tweet['url']}</a></p>
+        </div>
+    </div>
+
+    <footer>
+        <p>Auto-generated article • {date_str}</p>
+    </footer>
+</body>
+</html>"""
+
+    return title, html
+
+
+
+def make_articles(count):
+    paragraph = ("The **production schedule** at the plant slipped again this quarter, "
+                 "according to [official figures](https://example.com/report?id={i}). "
+                 "Analysts point to incentives that reward year-end output over steady work.")
+    articles = []
+    for i in range(count):
+        body = "\n\n".join(paragraph.format(i=i) for _ in range(4))
+        articles.append((
+            f"Title: Delays & bonuses, part {i}\n\n{body}\n\n"
+            f"References:\n1. [Report](https://example.com/{i})\n2. [Coverage](https://news.example.com/{i})\n\n"
+            f"Original Tweet: https://x.com/bench/status/{i}",
+            {'id': str(i), 'text': f"#tag tweet {i}", 'url': f"https://x.com/bench/status/{i}"},
+        ))
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    date = datetime.now()
+    renderer.render_article(*articles[0], BLOG_HOME, date)  # load templates once up front
+
+    def render_with(output):
+        def run():
+            renderer.SITE_OUTPUT = output
+            return [renderer.render_article(a, t, BLOG_HOME, date)[1] for a, t in articles]
+        return run
+
+    cases = [
+        ('legacy f-string', lambda: [legacy_create_article_html(a, t, BLOG_HOME)[1] for a, t in articles]),
+        ('renderer', render_with('standalone')),
+        ('renderer compact', render_with('compact')),
+    ]
+    print(f"{'renderer':<17} {'best s':>8} {'articles/s':>12} {'avg bytes':>10}")
+    for name, fn in cases:
+        pages = fn()
+        size = sum(len(page.encode('utf-8')) for page in pages) / len(pages)
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:<17} {best:>8.3f} {args.articles / best:>12,.0f} {size:>10,.0f}")
+    print(f"compact stylesheet: {renderer.stylesheet()[0]} "
+          f"({len(renderer.stylesheet()[1])} bytes, uploaded once)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Micro-benchmark: streaming RSS parser vs the original ET.fromstring parser.
+
+    python benchmarks/bench_rss.py [--items 1000 5000] [--repeat 5]
+
+Feeds are synthetic Nitter-style timelines where about 1 in 10 items
+carries the hashtag and descriptions are ~1 KB of HTML. The "early stop"
+case marks the 50th item as already processed, which is what a daily
+run sees once the fetch state is warm.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import timeit
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import rss  # noqa: E402
+
+HASHTAG = '#2ndPillarOfDemocracy'
+USERNAME = 'bench'
+
+
+def legacy_parse(xml_content):
+    """parse_rss_content as it was before streaming, minus the prints"""
+    root = ET.fromstring(xml_content)
+    items = root.findall('.//item')
+    if not items:
+        return None
+    quote_tweets = []
+    for item in items:
+        title = item.findtext('title') or ''
+        description = item.findtext('description') or ''
+        link = item.findtext('link') or ''
+        if HASHTAG.lower() not in f"{title} {description}".lower():
+            continue
+        tweet_id = link.split('/')[-1].replace('#m', '') if link else str(int(time.time()))
+        clean_desc = re.sub(r'<[^>]+>', ' ', description)
+        clean_desc = re.sub(r'\s+', ' ', clean_desc).strip()
+        quote_tweets.append({
+            'id': tweet_id,
+            'text': title,
+            'quoted_text': clean_desc[:500],
+            'url': link or f"https://x.com/{USERNAME}/status/{tweet_id}"
+        })
+    return quote_tweets if quote_tweets else None
+
+
+def make_feed(count):
+    paragraph = ('&lt;p&gt;Lorem ipsum dolor sit amet, &lt;a href="https://example.com"&gt;'
+                 'consectetur&lt;/a&gt; adipiscing elit.&lt;/p&gt; ') * 12
+    items = []
+    for i in range(count):
+        tweet_id = 2020221407486177419 - i
+        title = f"{HASHTAG} quote {i}" if i % 10 == 0 else f"Regular post {i}"
+        items.append(
+            f"<item><title>{title}</title>"
+            f"<description>{paragraph}</description>"
+            f"<link>https://nitter.net/{USERNAME}/status/{tweet_id}#m</link></item>"
+        )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss><channel><title>{USERNAME}</title>{"".join(items)}</channel></rss>'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, nargs='+', default=[1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    hashtag = HASHTAG.lower()
+
+    def matches(text):
+        return hashtag in text.lower()
+
+    print(f"{'items':>7} {'parser':<22} {'best ms':>9} {'items/s':>12}")
+    for count in args.items:
+        feed = make_feed(count)
+        known_id = str(2020221407486177419 - 50)
+
+        cases = [
+            ('legacy fromstring', lambda: legacy_parse(feed)),
+            ('streaming full', lambda: rss.parse_items(feed, matches, USERNAME)),
+            ('streaming early stop', lambda: rss.parse_items(
+                feed, matches, USERNAME, is_known=lambda i: i == known_id)),
+        ]
+        # Both parsers must agree on a full scan
+        assert legacy_parse(feed) == rss.parse_items(feed, matches, USERNAME)[0]
+
+        for name, fn in cases:
+            best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+            print(f"{count:>7} {name:<22} {best * 1000:>9.2f} {count / best:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+"""Local stand-ins for the services bot.py talks to.
+
+One threaded HTTP server answers for all of them, routed by path:
+
+    GET  /srv/timeline-profile/screen-name/<user>   syndication timeline
+    GET  /<user>/rss                                 Nitter RSS feed
+    GET  /duckduckgo/                                DuckDuckGo instant answers
+    POST /openai/v1/chat/completions                 Groq chat completions
+    *    /repos/<owner>/<repo>/contents/<path>       GitHub contents API
+    *    /repos/<owner>/<repo>/git/...               GitHub Git Data API (and blobs)
+
+Every service has its own latency, jitter and error rate (errors are 503s,
+so the bot's retries get exercised), and every request is logged with its
+service, start time, duration and status for the benchmark report.
+
+``tweets`` is either one timeline (for ``username``) or a dict of
+timelines by account, for runs with several feeds.
+
+GitHub and Groq can also be given a request ``Quota``: responses then
+carry that provider's rate-limit headers, and once the window is used up
+requests get GitHub's 403 or Groq's 429 with ``retry-after`` until it
+resets.
+"""
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SERVICES = ('syndication', 'nitter', 'duckduckgo', 'groq', 'github')
+
+WORDS = ('budget policy workers plant output quarter report council election court ruling '
+         'contract tender audit ministry railway harbour bridge schools hospital farmers '
+         'monsoon prices fuel tariff exports imports startup banking credit pension reform '
+         'census survey drought flood housing metro airport defence satellite vaccine '
+         'clinic teachers students exams scholarship river dam power grid solar wind coal '
+         'steel cement textile software license spectrum privacy data inquiry hearing').split()
+
+
+class Profile:
+    """Latency (seconds), jitter (+/- seconds) and error rate (0-1) of one service"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+
+class Quota:
+    """``limit`` requests per fixed ``window`` of seconds"""
+
+    def __init__(self, limit, window=60.0):
+        self.limit = limit
+        self.window = window
+        self.started = None
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Count one request; returns (allowed, remaining, seconds to reset)"""
+        with self.lock:
+            now = time.monotonic()
+            if self.started is None or now >= self.started + self.window:
+                self.started, self.used = now, 0
+            allowed = self.used < self.limit
+            self.used += allowed
+            return allowed, self.limit - self.used, self.started + self.window - now
+
+    def headers(self, service, remaining, reset_in):
+        if service == 'github':
+            return {
+                'X-RateLimit-Limit': str(self.limit),
+                'X-RateLimit-Remaining': str(remaining),
+                'X-RateLimit-Reset': str(int(time.time() + reset_in + 1)),
+                'X-RateLimit-Resource': 'core',
+            }
+        return {
+            'x-ratelimit-limit-requests': str(self.limit),
+            'x-ratelimit-remaining-requests': str(remaining),
+            'x-ratelimit-reset-requests': f"{reset_in:.2f}s",
+        }
+
+
+DEFAULT_PROFILES = {
+    'syndication': Profile(0.2),
+    'nitter': Profile(0.2),
+    'duckduckgo': Profile(0.1, jitter=0.05),
+    'groq': Profile(0.1, jitter=0.05),
+    'github': Profile(0.05, jitter=0.02),
+}
+
+
+def make_tweets(count, hashtag, seed=0):
+    """``count`` distinct quote tweets carrying the hashtag, newest first"""
+    rng = random.Random(seed)
+    tweets = []
+    for i in range(count):
+        tweet_id = str(1900000000000000000 + count - i)
+        tweets.append({
+            'id': tweet_id,
+            'text': f"{hashtag} {' '.join(rng.choice(WORDS) for _ in range(8))}",
+            'quoted_text': ' '.join(rng.choice(WORDS) for _ in range(25)).capitalize() + '.',
+        })
+    return tweets
+
+
+def _sha(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class FakeGitHub:
+    """Just enough of one repo's contents and Git Data APIs for publishing"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.trees = {}
+        self.commits = {}
+        self.files = {}
+        self.head = self._commit({}, None)
+        self.published_at = {}
+
+    def _commit(self, files, parent):
+        tree_sha = self._tree_sha(files)
+        self.trees[tree_sha] = files
+        commit_sha = _sha(f"{tree_sha}{parent}{time.time()}".encode('utf-8'))
+        self.commits[commit_sha] = {'tree': tree_sha, 'parent': parent}
+        return commit_sha
+
+    @staticmethod
+    def _tree_sha(files):
+        return _sha(json.dumps(sorted((path, sha) for path, (sha, _) in files.items())).encode('utf-8'))
+
+    def _set_head(self, commit_sha):
+        self.head = commit_sha
+        new_files = self.trees[self.commits[commit_sha]['tree']]
+        now = time.monotonic()
+        for path in new_files.keys() - self.files.keys():
+            if path.startswith('articles/'):
+                self.published_at[path] = now
+        self.files = new_files
+
+    def handle(self, method, path, body):
+        """Returns (status, payload) for a path relative to /repos/<owner>/<repo>/"""
+        with self.lock:
+            if path.startswith('contents/'):
+                return self._contents(method, path[len('contents/'):], body)
+            if method == 'GET' and path.startswith('git/ref/heads/'):
+                return 200, {'object': {'sha': self.head}}
+            if method == 'GET' and path.startswith('git/blobs/'):
+                blob_sha = path.rsplit('/', 1)[-1]
+                for sha, data in self.files.values():
+                    if sha == blob_sha:
+                        return 200, {'sha': sha, 'encoding': 'base64',
+                                     'content': base64.b64encode(data).decode('ascii')}
+                return 404, {'message': 'Not Found'}
+            if method == 'GET' and path.startswith('git/commits/'):
+                commit = self.commits.get(path.rsplit('/', 1)[-1])
+                if not commit:
+                    return 404, {'message': 'Not Found'}
+                return 200, {'sha': path.rsplit('/', 1)[-1], 'tree': {'sha': commit['tree']}}
+            if method == 'POST' and path == 'git/trees':
+                files = dict(self.trees.get(body.get('base_tree'), {}))
+                for entry in body.get('tree', []):
+                    data = entry['content'].encode('utf-8')
+                    files[entry['path']] = (_sha(data), data)
+                tree_sha = self._tree_sha(files)
+                self.trees[tree_sha] = files
+                return 201, {'sha': tree_sha}
+            if method == 'POST' and path == 'git/commits':
+                commit_sha = _sha(f"{body['tree']}{body['parents']}{time.time()}".encode('utf-8'))
+                self.commits[commit_sha] = {'tree': body['tree'], 'parent': body['parents'][0]}
+                return 201, {'sha': commit_sha}
+            if method == 'PATCH' and path.startswith('git/refs/heads/'):
+                commit = self.commits.get(body.get('sha'))
+                if not commit:
+                    return 422, {'message': 'Object does not exist'}
+                if commit['parent'] != self.head and not body.get('force'):
+                    return 422, {'message': 'Update is not a fast forward'}
+                self._set_head(body['sha'])
+                return 200, {'object': {'sha': self.head}}
+        return 404, {'message': 'Not Found'}
+
+    def _contents(self, method, path, body):
+        if method == 'GET':
+            if path in self.files:
+                sha, data = self.files[path]
+                return 200, {'name': path.rsplit('/', 1)[-1], 'path': path, 'sha': sha,
+                             'content': base64.b64encode(data).decode('ascii')}
+            prefix = path.rstrip('/') + '/'
+            listing = [{'name': p[len(prefix):], 'path': p}
+                       for p in self.files if p.startswith(prefix) and '/' not in p[len(prefix):]]
+            return (200, listing) if listing else (404, {'message': 'Not Found'})
+        if method == 'PUT':
+            current = self.files.get(path)
+            if current and body.get('sha') != current[0]:
+                return 409, {'message': f"{path} does not match {body.get('sha')}"}
+            data = base64.b64decode(body['content'])
+            files = dict(self.files)
+            files[path] = (_sha(data), data)
+            self._set_head(self._commit(files, self.head))
+            return (200 if current else 201), {'content': {'path': path, 'sha': files[path][0]}}
+        return 405, {'message': 'Method not allowed'}
+
+
+class FakeServices:
+    """All fake services behind one local server; use as a context manager"""
+
+    def __init__(self, tweets, username='bench', hashtag='#bench', profiles=None,
+                 source='syndication', tokens_per_second=1000.0, quotas=None, seed=0):
+        self.timelines = tweets if isinstance(tweets, dict) else {username: tweets}
+        self.username = username
+        self.hashtag = hashtag
+        self.profiles = dict(DEFAULT_PROFILES, **(profiles or {}))
+        self.source = source
+        self.tokens_per_second = tokens_per_second
+        self.quotas = quotas or {}
+        self.github = FakeGitHub()
+        self.log = []
+        self._log_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._server = None
+        self.started = None
+
+    # -- server lifecycle ---------------------------------------------------
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                services._dispatch(self)
+
+            do_POST = do_PUT = do_PATCH = do_GET
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.started = time.monotonic()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables that point bot.py at these fakes"""
+        return {
+            'SYNDICATION_URL': self.url,
+            'NITTER_INSTANCES': self.url,
+            'DUCKDUCKGO_URL': f"{self.url}/duckduckgo/",
+            'GROQ_BASE_URL': self.url,
+            'GITHUB_API_URL': self.url,
+            'X_USERNAME': self.username,
+            'HASHTAG': self.hashtag,
+        }
+
+    # -- request handling ---------------------------------------------------
+
+    def _route(self, method, path):
+        if path.startswith('/srv/timeline-profile/'):
+            return 'syndication'
+        if path.endswith('/rss') and path[1:-len('/rss')] in self.timelines:
+            return 'nitter'
+        if path.startswith('/duckduckgo'):
+            return 'duckduckgo'
+        if path.startswith('/openai/'):
+            return 'groq'
+        if path.startswith('/repos/'):
+            return 'github'
+        return None
+
+    def _dispatch(self, handler):
+        started = time.monotonic()
+        handler.extra_headers = {}
+        url = urlparse(handler.path)
+        service = self._route(handler.command, url.path)
+        length = int(handler.headers.get('Content-Length') or 0)
+        raw = handler.rfile.read(length) if length else b''
+        body = json.loads(raw) if raw else {}
+
+        status = 404
+        if service:
+            profile = self.profiles[service]
+            with self._log_lock:
+                delay = max(0.0, profile.latency + self._rng.uniform(-profile.jitter, profile.jitter))
+                failed = self._rng.random() < profile.error_rate
+            time.sleep(delay)
+            quota = self.quotas.get(service)
+            allowed = True
+            if quota:
+                allowed, remaining, reset_in = quota.take()
+                handler.extra_headers = quota.headers(service, remaining, reset_in)
+                if not allowed and service == 'groq':
+                    handler.extra_headers['retry-after'] = str(int(reset_in) + 1)
+            if not allowed:
+                status = self._send_json(handler, 403 if service == 'github' else 429,
+                                         {'message': 'rate limit exceeded'})
+            elif failed:
+                status = self._send_json(handler, 503, {'message': 'injected failure'})
+            else:
+                status = getattr(self, f"_{service}")(handler, url, body)
+        else:
+            self._send_json(handler, 404, {'message': 'Not Found'})
+
+        with self._log_lock:
+            self.log.append({
+                'service': service or 'unknown',
+                'method': handler.command,
+                'start': started - self.started,
+                'duration': time.monotonic() - started,
+                'status': status,
+            })
+
+    def _send(self, handler, status, data, content_type):
+        handler.send_response(status)
+        self._send_extra_headers(handler)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+        return status
+
+    @staticmethod
+    def _send_extra_headers(handler):
+        for name, value in getattr(handler, 'extra_headers', {}).items():
+            handler.send_header(name, value)
+
+    def _send_json(self, handler, status, payload):
+        return self._send(handler, status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def _syndication(self, handler, url, body):
+        tweets = self.timelines.get(url.path.rsplit('/', 1)[-1])
+        if self.source != 'syndication' or tweets is None:
+            return self._send_json(handler, 404, {'message': 'Not Found'})
+        entries = [{'tweet': {
+            'id_str': t['id'],
+            'full_text': t['text'],
+            'quoted_status': {'full_text': t['quoted_text']},
+        }} for t in tweets]
+        return self._send_json(handler, 200, {'timeline': {'entries': entries}})
+
+    def _nitter(self, handler, url, body):
+        if self.source != 'rss':
+            return self._send(handler, 404, b'Not Found', 'text/plain')
+        username = url.path[1:-len('/rss')]
+        items = ''.join(
+            f"<item><title>{t['text']}</title>"
+            f"<description>&lt;p&gt;{t['quoted_text']}&lt;/p&gt;</description>"
+            f"<link>{self.url}/{username}/status/{t['id']}#m</link></item>"
+            for t in self.timelines[username]
+        )
+        feed = f'<?xml version="1.0" encoding="UTF-8"?><rss><channel><title>{username}</title>{items}</channel></rss>'
+        return self._send(handler, 200, feed.encode('utf-8'), 'application/rss+xml')
+
+    def _duckduckgo(self, handler, url, body):
+        query = parse_qs(url.query).get('q', [''])[0]
+        slug = re.sub(r'\W+', '_', query)[:40]
+        return self._send_json(handler, 200, {
+            'AbstractSource': 'Wikipedia',
+            'AbstractURL': f"https://en.wikipedia.org/wiki/{slug}",
+            'AbstractText': f"{query}. " * 6,
+            'RelatedTopics': [
+                {'Text': f"{query} related topic {i}", 'FirstURL': f"https://duckduckgo.com/{slug}_{i}"}
+                for i in range(4)
+            ],
+        })
+
+    def _groq(self, handler, url, body):
+        prompt = body['messages'][-1]['content']
+        tweet_url = re.search(r'Original Tweet: (\S+)', prompt)
+        topic = re.search(r'QUOTED CONTENT: (.*)', prompt)
+        article = self._article(topic.group(1) if topic else 'the topic',
+                                tweet_url.group(1) if tweet_url else '')
+        words = article.split(' ')
+        generation_time = len(words) / self.tokens_per_second if self.tokens_per_second else 0
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(words),
+                 'total_tokens': len(prompt) // 4 + len(words)}
+        base = {'id': 'chatcmpl-bench', 'created': int(time.time()), 'model': body.get('model', 'bench')}
+
+        if not body.get('stream'):
+            time.sleep(generation_time)
+            return self._send_json(handler, 200, dict(base, object='chat.completion', usage=usage, choices=[{
+                'index': 0, 'finish_reason': 'stop',
+                'message': {'role': 'assistant', 'content': article},
+            }]))
+
+        handler.send_response(200)
+        self._send_extra_headers(handler)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+
+        def send_event(payload):
+            data = f"data: {payload}\n\n".encode('utf-8')
+            handler.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+
+        # Sent in ten bursts so the client sees a realistic token rate
+        burst = max(1, len(words) // 10)
+        try:
+            for i in range(0, len(words), burst):
+                time.sleep(generation_time / 10)
+                text = ' '.join(words[i:i + burst]) + (' ' if i + burst < len(words) else '')
+                send_event(json.dumps(dict(base, object='chat.completion.chunk', choices=[{
+                    'index': 0, 'delta': {'content': text}, 'finish_reason': None,
+                }])))
+            send_event(json.dumps(dict(base, object='chat.completion.chunk', x_groq={'usage': usage}, choices=[{
+                'index': 0, 'delta': {}, 'finish_reason': 'stop',
+            }])))
+            send_event('[DONE]')
+            handler.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The bot hangs up once it has the "Original Tweet:" line
+            pass
+        return 200
+
+    def _article(self, topic, tweet_url):
+        rng = random.Random(tweet_url)
+        paragraphs = [
+            ' '.join(rng.choice(WORDS) for _ in range(60)).capitalize() + '.'
+            for _ in range(4)
+        ]
+        paragraphs[1] = f"**{topic[:40]}** " + paragraphs[1]
+        return (
+            f"Title: {' '.join(rng.choice(WORDS) for _ in range(6)).title()}\n\n"
+            + '\n\n'.join(paragraphs)
+            + "\n\nReferences:\n1. [Wikipedia](https://en.wikipedia.org/wiki/Bench)\n"
+            + f"2. [Report](https://example.com/report)\n\nOriginal Tweet: {tweet_url}\n"
+        )
+
+    def _github(self, handler, url, body):
+        parts = url.path.split('/', 4)
+        path = parts[4] if len(parts) > 4 else ''
+        status, payload = self.github.handle(handler.command, path, body)
+        return self._send_json(handler, status, payload)
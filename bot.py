@@ -1,12 +1,36 @@
 import requests
 import json
 import os
-from datetime import datetime
 import time
 import re
-import base64
+import hashlib
 import xml.etree.ElementTree as ET
-from groq import Groq
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FuturesTimeout
+import argparse
+import runpy
+import subprocess
+import sys
+import threading
+
+import backfill
+import budget
+import feeds
+from cache import DiskCache, MISS
+from fetch_state import FetchState
+import http_client
+import manifest
+import metrics
+import publisher
+from publisher import PublishError
+from nitter_health import NitterHealth, load_instances
+import ratelimit
+import renderer
+import rss
+from similarity import SimilarityIndex
+from store import ProcessedStore
+import work_queue
+from work_queue import WorkQueue
 
 # ============================================
 # CONFIGURATION
@@ -19,44 +43,181 @@ BLOG_GITHUB_USERNAME = os.getenv('BLOG_GITHUB_USERNAME', '')
 # BLOG_REPO = f"{BLOG_GITHUB_USERNAME}.github.io"
 BLOG_REPO_NAME = os.getenv('BLOG_REPO_NAME', '')
 BLOG_REPO = BLOG_REPO_NAME
+BLOG_HOME = f"/{BLOG_REPO_NAME}/" if BLOG_REPO_NAME else "/"
+# Accounts fetched at once when feeds.json lists several
+FEED_WORKERS = max(1, int(os.getenv('FEED_WORKERS', '8')))
+# Nitter racing: parallel requests, per-request timeout, overall deadline (seconds)
+NITTER_CONCURRENCY = max(1, int(os.getenv('NITTER_CONCURRENCY', '5')))
+NITTER_TIMEOUT = float(os.getenv('NITTER_TIMEOUT', '10'))
+NITTER_DEADLINE = float(os.getenv('NITTER_DEADLINE', '12'))
+# Pipeline workers per stage; publishing stays serial because each article
+# read-modify-writes index.html
+RESEARCH_WORKERS = max(1, int(os.getenv('RESEARCH_WORKERS', '3')))
+GENERATE_WORKERS = max(1, int(os.getenv('GENERATE_WORKERS', '2')))
+PUBLISH_WORKERS = 1
+# Skip tweets whose text/quoted text nearly matches an already published one
+NEAR_DUPLICATE_CHECK = os.getenv('NEAR_DUPLICATE_CHECK', '1') == '1'
+# Where the site is published (see publisher.py): 'github-contents' commits
+# each article and page separately, 'github-batch' writes every article plus
+# the homepage in one Git Data API commit, 'local' writes the site tree to
+# LOCAL_SITE_DIR (and commits it to a local git repo if LOCAL_SITE_GIT=1).
+# PUBLISH_MODE=batch is the older spelling of github-batch
+PUBLISH_MODE = os.getenv('PUBLISH_MODE', 'contents')
+PUBLISHER = os.getenv('PUBLISHER') or ('github-batch' if PUBLISH_MODE == 'batch' else 'github-contents')
+LOCAL_SITE_DIR = os.getenv('LOCAL_SITE_DIR', 'site')
+LOCAL_SITE_GIT = os.getenv('LOCAL_SITE_GIT', '') == '1'
+# Tweets processed per run; the rest are picked up by the next run
+MAX_TWEETS_PER_RUN = max(1, int(os.getenv('MAX_TWEETS_PER_RUN', '10')))
+# Service endpoints, overridable to point the bot at local stand-ins
+# (see benchmarks/bench_e2e.py)
+SYNDICATION_URL = os.getenv('SYNDICATION_URL', 'https://syndication.twitter.com').rstrip('/')
+DUCKDUCKGO_URL = os.getenv('DUCKDUCKGO_URL', 'https://api.duckduckgo.com/')
+GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+GROQ_BASE_URL = os.getenv('GROQ_BASE_URL') or None
+# Research results are cached per query, negative (empty) results for less long
+RESEARCH_CACHE_TTL_HOURS = float(os.getenv('RESEARCH_CACHE_TTL_HOURS', '168'))
+RESEARCH_CACHE_SIZE = int(os.getenv('RESEARCH_CACHE_SIZE', '2000'))
+RESEARCH_CACHE_NEGATIVE_TTL_HOURS = float(os.getenv('RESEARCH_CACHE_NEGATIVE_TTL_HOURS', '12'))
+GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.3-70b-versatile')
+# Target article length drives max_tokens; sources are trimmed to keep the
+# prompt under PROMPT_TOKEN_BUDGET (estimated tokens)
+ARTICLE_WORDS = int(os.getenv('ARTICLE_WORDS', '300'))
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1200'))
+token_ledger = budget.TokenLedger()
+BYPASS_GENERATION_CACHE = os.getenv('BYPASS_GENERATION_CACHE', '') == '1'
+# Stream completions to get time-to-first-token and stop at the trailer
+GROQ_STREAM = os.getenv('GROQ_STREAM', '') == '1'
+GENERATION_CACHE_TTL_DAYS = float(os.getenv('GENERATION_CACHE_TTL_DAYS', '30'))
+GENERATION_CACHE_SIZE = int(os.getenv('GENERATION_CACHE_SIZE', '500'))
+
+# Secrets each CLI command needs
+REQUIRED_SECRETS = {
+    'run': ('X_USERNAME', 'HASHTAG', 'GROQ_API_KEY', 'BLOG_GITHUB_TOKEN',
+            'BLOG_GITHUB_USERNAME', 'BLOG_REPO_NAME'),
+    'fetch': ('X_USERNAME', 'HASHTAG'),
+    'render': (),
+    'publish': ('BLOG_GITHUB_TOKEN', 'BLOG_GITHUB_USERNAME', 'BLOG_REPO_NAME'),
+    'bench': (),
+    'queue': (),
+    'backfill': ('X_USERNAME', 'HASHTAG', 'GROQ_API_KEY', 'BLOG_GITHUB_TOKEN',
+                 'BLOG_GITHUB_USERNAME', 'BLOG_REPO_NAME'),
+}
+
 # ============================================
 # STARTUP
 # ============================================
-print("\n" + "="*50)
-print("🚀 X TO GITHUB PAGES BOT STARTED")
-print("="*50 + "\n")
-
-print("🔍 Configuration Check:")
-print(f"  X Username:          {'✅' if X_USERNAME else '❌ MISSING'}")
-print(f"  Hashtag:             {'✅' if HASHTAG else '❌ MISSING'}")
-print(f"  Groq API Key:        {'✅' if GROQ_API_KEY else '❌ MISSING'}")
-print(f"  Blog GitHub Token:   {'✅' if BLOG_GITHUB_TOKEN else '❌ MISSING'}")
-print(f"  Blog GitHub Username:{'✅' if BLOG_GITHUB_USERNAME else '❌ MISSING'}")
-print(f"  Blog Repo Name:      {'✅' if BLOG_REPO_NAME else '❌ MISSING'}")
-
-missing = []
-if not X_USERNAME: missing.append('X_USERNAME')
-if not HASHTAG: missing.append('HASHTAG')
-if not GROQ_API_KEY: missing.append('GROQ_API_KEY')
-if not BLOG_GITHUB_TOKEN: missing.append('BLOG_GITHUB_TOKEN')
-if not BLOG_GITHUB_USERNAME: missing.append('BLOG_GITHUB_USERNAME')
-if not BLOG_REPO_NAME: missing.append('BLOG_REPO_NAME')
-    
-if missing:
-    print(f"\n❌ MISSING SECRETS: {', '.join(missing)}")
-    exit(1)
-
-print(f"\n✅ All secrets loaded!")
-# print(f"📝 Blog will publish to: https://{BLOG_REPO}\n")
-print(f"📝 Blog will publish to: https://{BLOG_GITHUB_USERNAME}.github.io/{BLOG_REPO_NAME}/\n")
-
-# Initialize Groq
-try:
-    groq_client = Groq(api_key=GROQ_API_KEY)
-    print("✅ Groq AI initialized\n")
-except Exception as e:
-    print(f"❌ Groq init failed: {str(e)}")
-    exit(1)
+# Importing this module has no side effects: configuration is checked and
+# on-disk state opened by the CLI commands, and groq is imported on the
+# first generation.
+
+def check_config(command):
+    """Print the configuration check; returns the missing secrets for ``command``"""
+    print("🔍 Configuration Check:")
+    missing = []
+    if feeds.configured():
+        try:
+            accounts = feeds.by_account(get_feeds())
+            print(f"  Feeds:               ✅ {len(get_feeds())} feed(s), {len(accounts)} account(s)")
+        except ValueError as e:
+            print(f"  Feeds:               ❌ {e}")
+            if 'X_USERNAME' in REQUIRED_SECRETS[command]:
+                missing.append('FEEDS_FILE')
+    else:
+        print(f"  X Username:          {'✅' if X_USERNAME else '❌ MISSING'}")
+        print(f"  Hashtag:             {'✅' if HASHTAG else '❌ MISSING'}")
+    print(f"  Groq API Key:        {'✅' if GROQ_API_KEY else '❌ MISSING'}")
+    print(f"  Blog GitHub Token:   {'✅' if BLOG_GITHUB_TOKEN else '❌ MISSING'}")
+    print(f"  Blog GitHub Username:{'✅' if BLOG_GITHUB_USERNAME else '❌ MISSING'}")
+    print(f"  Blog Repo Name:      {'✅' if BLOG_REPO_NAME else '❌ MISSING'}")
+    return missing + [name for name in required_secrets(command) if not globals()[name]]
+
+def required_secrets(command):
+    required = REQUIRED_SECRETS[command]
+    if feeds.configured():
+        # Accounts and hashtags come from feeds.json instead
+        required = tuple(name for name in required if name not in ('X_USERNAME', 'HASHTAG'))
+    if PUBLISHER == 'local':
+        # A local site build never talks to GitHub
+        required = tuple(name for name in required if not name.startswith('BLOG_'))
+    return required
+
+_feeds = None
+
+def get_feeds():
+    """Configured feeds (feeds.json, or X_USERNAME/HASHTAG); raises ValueError"""
+    global _feeds
+    if _feeds is None:
+        _feeds = feeds.load(feeds.FEEDS_FILE, X_USERNAME, HASHTAG)
+    return _feeds
+
+_groq_client = None
+_groq_lock = threading.Lock()
+
+def get_groq_client():
+    """Groq client, created (and the groq package imported) on first use"""
+    global _groq_client
+    with _groq_lock:
+        if _groq_client is None:
+            from groq import Groq
+            # No SDK retries: groq_completion retries, paced by ratelimit
+            _groq_client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=0)
+            print("  ✅ Groq AI initialized")
+        return _groq_client
+
+def groq_completion(request, stream=False):
+    """chat.completions.create that reports Groq's rate-limit headers to
+    ratelimit and retries once a 429's retry-after has passed, or after a
+    short backoff on a 5xx or connection error"""
+    from groq import APIConnectionError, APIStatusError
+    client = get_groq_client()
+    for attempt in range(ratelimit.RETRIES + 1):
+        if attempt:
+            ratelimit.acquire('groq')
+        try:
+            raw = client.chat.completions.with_raw_response.create(stream=stream, **request)
+        except APIStatusError as e:
+            wait = ratelimit.observe('groq', e.status_code, e.response.headers)
+            if attempt == ratelimit.RETRIES or not (wait or e.status_code >= 500):
+                raise
+            if wait:
+                print(f"  🚦 groq rate limited ({e.status_code}), retrying in {wait:.0f}s")
+            else:
+                time.sleep(0.5 * 2 ** attempt)
+            continue
+        except APIConnectionError:
+            if attempt == ratelimit.RETRIES:
+                raise
+            time.sleep(0.5 * 2 ** attempt)
+            continue
+        ratelimit.observe('groq', raw.status_code, raw.headers)
+        return raw.parse()
+
+# On-disk state in the working directory, opened by load_state()
+fetch_state = None
+research_cache = None
+generation_cache = None
+
+def load_state():
+    """Open the fetch state and the research/generation caches"""
+    global fetch_state, research_cache, generation_cache
+    if fetch_state is not None:
+        return
+    # ETag/Last-Modified per feed URL and newest tweet ID seen per account
+    fetch_state = FetchState()
+    # Research results cached across runs, keyed by the normalized query
+    research_cache = DiskCache(
+        '.cache/research.json',
+        ttl=RESEARCH_CACHE_TTL_HOURS * 3600,
+        max_entries=RESEARCH_CACHE_SIZE,
+        negative_ttl=RESEARCH_CACHE_NEGATIVE_TTL_HOURS * 3600,
+    )
+    # Generated articles cached by a hash of the full Groq request, so a
+    # failed publish doesn't re-spend a generation on the next run
+    generation_cache = DiskCache(
+        '.cache/generations.json',
+        ttl=GENERATION_CACHE_TTL_DAYS * 86400,
+        max_entries=GENERATION_CACHE_SIZE,
+    )
 
 # GitHub API headers
 GITHUB_HEADERS = {
@@ -69,46 +230,40 @@ GITHUB_HEADERS = {
 # PROCESSED TWEETS
 # ============================================
 
-def get_processed_tweets():
-    try:
-        with open('processed_tweets.json', 'r') as f:
-            data = json.load(f)
-            print(f"📋 {len(data)} previously processed tweets")
-            return data
-    except FileNotFoundError:
+def load_processed_store():
+    store = ProcessedStore()
+    if len(store):
+        print(f"📋 {len(store)} previously processed tweets")
+    else:
         print("📋 Starting fresh")
-        return []
-
-def save_processed_tweet(tweet_id):
-    processed = get_processed_tweets()
-    processed.append({
-        'id': str(tweet_id),
-        'processed_at': datetime.now().isoformat()
-    })
-    with open('processed_tweets.json', 'w') as f:
-        json.dump(processed, f, indent=2)
-    print(f"✅ Saved tweet {tweet_id}")
+    return store
 
 # ============================================
 # METHOD 1: TWITTER SYNDICATION
 # ============================================
 
-def fetch_via_syndication():
-    print("\n📡 Method 1: Twitter Syndication API...")
-    url = f"https://syndication.twitter.com/srv/timeline-profile/screen-name/{X_USERNAME}"
+@metrics.timed('fetch_syndication')
+def fetch_via_syndication(account, matches):
+    print(f"\n📡 Method 1: Twitter Syndication API (@{account})...")
+    url = f"{SYNDICATION_URL}/srv/timeline-profile/screen-name/{account}"
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
         'Accept': 'application/json',
-        'Referer': f'https://twitter.com/{X_USERNAME}'
+        'Referer': f'https://twitter.com/{account}'
     }
+    headers.update(fetch_state.headers_for(url))
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = http_client.get(url, headers=headers, timeout=15)
         print(f"  Status: {response.status_code}")
+        if response.status_code == 304:
+            print("  ✅ Timeline not modified since last run")
+            return []
         if response.status_code == 200 and response.text.strip():
             try:
                 data = response.json()
-                tweets = extract_from_syndication(data)
-                if tweets:
+                fetch_state.observe_response(url, response)
+                tweets = extract_from_syndication(data, account, matches)
+                if tweets is not None:
                     return tweets
             except json.JSONDecodeError as e:
                 print(f"  ❌ JSON error: {str(e)}")
@@ -118,28 +273,43 @@ def fetch_via_syndication():
         print(f"  ❌ Error: {str(e)[:80]}")
     return None
 
-def extract_from_syndication(data):
+def extract_from_syndication(data, account, matches):
+    """Quote tweets whose text ``matches`` (which returns extra tweet fields
+    or None), newest first. Stops at the first tweet already seen on a
+    previous run; returns [] if nothing is new, None if nothing matched"""
     try:
         entries = data.get('timeline', {}).get('entries', [])
         print(f"  Found {len(entries)} entries")
         quote_tweets = []
-        for entry in entries:
+        reached_known = False
+        for index, entry in enumerate(entries):
             tweet = entry.get('tweet', {})
+            tweet_id = tweet.get('id_str', '')
+            if fetch_state.is_known(account, tweet_id):
+                # The first entry may be an old pinned tweet; anything after is history
+                if index == 0:
+                    continue
+                reached_known = True
+                break
+            fetch_state.saw(account, tweet_id)
             text = tweet.get('full_text', tweet.get('text', ''))
-            if not text or HASHTAG.lower() not in text.lower():
-                continue
             quoted = tweet.get('quoted_status', {})
-            if not quoted:
+            if not text or not quoted:
+                continue
+            fields = matches(text)
+            if not fields:
                 continue
-            tweet_id = tweet.get('id_str', '')
             quote_tweets.append({
                 'id': tweet_id,
                 'text': text,
                 'quoted_text': quoted.get('full_text', quoted.get('text', '')),
-                'url': f"https://x.com/{X_USERNAME}/status/{tweet_id}"
+                'url': f"https://x.com/{account}/status/{tweet_id}",
+                **fields
             })
             print(f"  ✅ Found: {tweet_id}")
-        return quote_tweets if quote_tweets else None
+        if reached_known and not quote_tweets:
+            print("  ✅ No new tweets since last run")
+        return quote_tweets if quote_tweets or reached_known else None
     except Exception as e:
         print(f"  ❌ Parse error: {str(e)}")
         return None
@@ -147,22 +317,58 @@ def extract_from_syndication(data):
 # ============================================
 # METHOD 2: RSS PROXY
 # ============================================
-def fetch_via_rss_proxy():
-    """Try multiple Nitter instances directly"""
-    print("\n📡 Method 2: Direct Nitter Instances...")
-
-    nitter_instances = [
-        'https://nitter.net',
-        'https://nitter.poast.org',
-        'https://nitter.privacydev.net',
-        'https://nitter.lucabased.xyz',
-        'https://nitter.lunar.icu',
-        'https://nitter.rawbit.ninja',
-        'https://nitter.mint.lgbt',
-        'https://nitter.bus-hit.me',
-        'https://tweet.namejeff.com',
-        'https://nitter.nicfab.eu',
-    ]
+def nitter_url(instance, account):
+    return f"{instance}/{account}/rss"
+
+def fetch_nitter_instance(instance, account, headers, timeout):
+    """Fetch one instance's RSS feed; returns (response or None, error, latency).
+
+    A returned response is either a 304 or a 200 that looks like RSS.
+    """
+    rss_url = nitter_url(instance, account)
+    result, error = None, None
+    started = time.monotonic()
+    try:
+        response = http_client.get(
+            rss_url,
+            headers=dict(headers, **fetch_state.headers_for(rss_url)),
+            timeout=timeout,
+            # The race moves on to other instances; retrying a dead one
+            # would hold its slot past NITTER_DEADLINE
+            retries=0,
+            allow_redirects=True
+        )
+        body = response.text
+        if response.status_code == 304:
+            result = response
+        elif response.status_code != 200:
+            error = f"Status {response.status_code}"
+        elif not body or len(body) < 100:
+            error = "Empty or too short"
+        elif '<rss' in body or '<item>' in body:
+            result = response
+        else:
+            error = "Not RSS content"
+
+    except requests.exceptions.Timeout:
+        error = "Timeout"
+    except requests.exceptions.ConnectionError:
+        error = "Connection failed"
+    except Exception as e:
+        error = f"Error: {str(e)[:60]}"
+    return result, error, time.monotonic() - started
+
+@metrics.timed('fetch_rss')
+def fetch_via_rss_proxy(health, account, matches):
+    """Race multiple Nitter instances, first valid feed wins"""
+    print(f"\n📡 Method 2: Direct Nitter Instances (@{account})...")
+
+    nitter_instances, skipped = health.order(load_instances())
+    if skipped:
+        print(f"  ⏭️  Skipping {len(skipped)} instance(s) with open circuit")
+    if not nitter_instances:
+        print("  ❌ No Nitter instances available")
+        return None
 
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
@@ -171,80 +377,73 @@ def fetch_via_rss_proxy():
         'Cache-Control': 'no-cache',
     }
 
-    for instance in nitter_instances:
-        rss_url = f"{instance}/{X_USERNAME}/rss"
-        try:
-            print(f"  Trying: {instance}...")
-            response = requests.get(
-                rss_url,
-                headers=headers,
-                timeout=10,
-                allow_redirects=True
-            )
-            print(f"  Status: {response.status_code}")
-
-            if response.status_code != 200:
-                continue
+    deadline = time.monotonic() + NITTER_DEADLINE
+    timeout = min(NITTER_TIMEOUT, NITTER_DEADLINE)
+    print(f"  Racing {len(nitter_instances)} instances "
+          f"({NITTER_CONCURRENCY} at a time, {NITTER_DEADLINE:g}s deadline)")
 
-            content = response.text
-            if not content or len(content) < 100:
-                print(f"  ❌ Empty or too short")
+    executor = ThreadPoolExecutor(max_workers=NITTER_CONCURRENCY)
+    futures = {
+        executor.submit(fetch_nitter_instance, instance, account, headers, timeout): instance
+        for instance in nitter_instances
+    }
+    try:
+        for future in as_completed(futures, timeout=max(0, deadline - time.monotonic())):
+            instance = futures[future]
+            response, error, latency = future.result()
+            if error:
+                health.record_failure(instance, latency)
+                print(f"  ❌ {instance}: {error}")
                 continue
 
-            if '<rss' in content or '<item>' in content:
-                print(f"  ✅ Valid RSS from {instance}!")
-                result = parse_rss_content(content)
-                if result:
-                    return result
-                else:
-                    print(f"  ⚠️  RSS parsed but no matching tweets")
-            else:
-                print(f"  ❌ Not RSS content")
-
-        except requests.exceptions.Timeout:
-            print(f"  ❌ Timeout")
-        except requests.exceptions.ConnectionError:
-            print(f"  ❌ Connection failed")
-        except Exception as e:
-            print(f"  ❌ Error: {str(e)[:60]}")
+            health.record_success(instance, latency)
+            if response.status_code == 304:
+                print(f"  ✅ {instance}: feed not modified since last run")
+                return []
+            print(f"  ✅ Valid RSS from {instance}!")
+            # Only the feed we actually parse may answer 304 next time
+            fetch_state.observe_response(nitter_url(instance, account), response)
+            result = parse_rss_content(response.text, account, matches)
+            if result is not None:
+                return result
+            print(f"  ⚠️  RSS parsed but no matching tweets")
+    except FuturesTimeout:
+        print(f"  ❌ Deadline of {NITTER_DEADLINE:g}s reached")
+    finally:
+        # Drop queued instances; in-flight requests end on their own timeout
+        executor.shutdown(wait=False, cancel_futures=True)
 
     print("  ❌ All Nitter instances failed")
     return None
-    
-def parse_rss_content(xml_content):
+
+def parse_rss_content(xml_content, account, matches):
+    """Same contract as extract_from_syndication: stops at the account's
+    first known tweet, [] if nothing is new, None if nothing matched"""
     print("\n  🔍 Parsing RSS...")
     try:
-        root = ET.fromstring(xml_content)
-        items = root.findall('.//item')
-        print(f"  Found {len(items)} items")
-        if not items:
-            return None
-        quote_tweets = []
-        for item in items:
-            title = item.findtext('title') or ''
-            description = item.findtext('description') or ''
-            link = item.findtext('link') or ''
-            if HASHTAG.lower() not in f"{title} {description}".lower():
-                continue
-            tweet_id = link.split('/')[-1].replace('#m', '') if link else str(int(time.time()))
-            clean_desc = re.sub(r'<[^>]+>', ' ', description)
-            clean_desc = re.sub(r'\s+', ' ', clean_desc).strip()
-            quote_tweets.append({
-                'id': tweet_id,
-                'text': title,
-                'quoted_text': clean_desc[:500],
-                'url': link or f"https://x.com/{X_USERNAME}/status/{tweet_id}"
-            })
-            print(f"  ✅ Added: {tweet_id}")
-        return quote_tweets if quote_tweets else None
+        quote_tweets, scanned, reached_known = rss.parse_items(
+            xml_content,
+            matches,
+            account,
+            is_known=lambda tweet_id: fetch_state.is_known(account, tweet_id),
+            saw=lambda tweet_id: fetch_state.saw(account, tweet_id),
+        )
     except ET.ParseError as e:
         print(f"  ❌ XML error: {str(e)}")
         return None
 
+    print(f"  Scanned {scanned} items{' (stopped at a known tweet)' if reached_known else ''}")
+    for tweet in quote_tweets:
+        print(f"  ✅ Added: {tweet['id']}")
+    if reached_known and not quote_tweets:
+        print("  ✅ No new tweets since last run")
+    return quote_tweets if quote_tweets or reached_known else None
+
 # ============================================
 # METHOD 3: MANUAL TWEETS
 # ============================================
 
+@metrics.timed('fetch_manual')
 def check_manual_tweets():
     print("\n📡 Method 3: Checking manual_tweets.json...")
     try:
@@ -257,11 +456,15 @@ def check_manual_tweets():
         if not data:
             return None
         print(f"  ✅ Found {len(data)} manual tweet(s)!")
+        # Entries without an account belong to the first feed
+        default = (get_feeds() or [feeds.Feed(X_USERNAME, HASHTAG)])[0]
         for tweet in data:
             if not tweet.get('url'):
-                tweet['url'] = f"https://x.com/{X_USERNAME}/status/{tweet['id']}"
+                tweet['url'] = f"https://x.com/{tweet.get('account') or default.account}/status/{tweet['id']}"
             if not tweet.get('text'):
-                tweet['text'] = HASHTAG
+                tweet['text'] = default.hashtags[0] if default.hashtags else ''
+            if not tweet.get('section') and not tweet.get('account') and default.section:
+                tweet['section'] = default.section
             if not tweet.get('quoted_text'):
                 tweet['quoted_text'] = ''
         return data
@@ -273,6 +476,7 @@ def check_manual_tweets():
 # RESEARCH
 # ============================================
 
+@metrics.timed('research')
 def research_topic(text):
     print("\n🔬 Researching topic...")
     query = re.sub(r'#\w+', '', text)
@@ -281,11 +485,19 @@ def research_topic(text):
     if not query:
         query = text[:150]
     print(f"  Query: {query[:80]}")
+
+    cache_key = query.lower()
+    cached = research_cache.get(cache_key)
+    if cached is not MISS:
+        print(f"  ♻️  Cached: {len(cached)} sources")
+        return cached
+
     try:
-        response = requests.get(
-            "https://api.duckduckgo.com/",
+        response = http_client.get(
+            DUCKDUCKGO_URL,
             params={'q': query, 'format': 'json', 'no_html': 1, 'skip_disambig': 1},
-            timeout=10
+            timeout=10,
+            provider='duckduckgo'
         )
         data = response.json()
         sources = []
@@ -303,6 +515,8 @@ def research_topic(text):
                     'snippet': topic.get('Text', '')[:300]
                 })
         print(f"  ✅ Found {len(sources)} sources")
+        # Empty results are cached too, with the shorter negative TTL
+        research_cache.set(cache_key, sources)
         return sources
     except Exception as e:
         print(f"  ❌ Error: {str(e)}")
@@ -312,14 +526,8 @@ def research_topic(text):
 # ARTICLE GENERATION
 # ============================================
 
-def generate_article(tweet, sources):
-    print("\n✍️  Generating article with Groq AI...")
-    sources_text = "\n".join([
-        f"- {s['title']}: {s['snippet']} (URL: {s['url']})"
-        for s in sources
-    ]) if sources else "Use your general knowledge."
-
-    prompt = f"""You are a professional blogger. Write a 300-word article.
+def build_prompt(tweet, sources_text):
+    return f"""You are a professional blogger. Write a {ARTICLE_WORDS}-word article.
 
 TWEET: {tweet['text']}
 QUOTED CONTENT: {tweet.get('quoted_text', 'N/A')[:300]}
@@ -342,23 +550,167 @@ References:
 
 Original Tweet: {tweet['url']}
 """
-    try:
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a professional blogger writing 300-word articles."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=1000,
-            temperature=0.7
+
+@metrics.timed('generate')
+def generate_article(tweet, sources):
+    print("\n✍️  Generating article with Groq AI...")
+    system_prompt = f"You are a professional blogger writing {ARTICLE_WORDS}-word articles."
+
+    # Spend whatever the prompt budget leaves after the fixed parts on sources
+    fixed_tokens = budget.estimate_tokens(system_prompt + build_prompt(tweet, ''))
+    if sources:
+        kept = budget.fit_sources(
+            sources,
+            f"{tweet['text']} {tweet.get('quoted_text', '')}",
+            PROMPT_TOKEN_BUDGET - fixed_tokens
         )
-        article = response.choices[0].message.content
+        if len(kept) < len(sources):
+            print(f"  ✂️  Kept {len(kept)} of {len(sources)} sources to fit the prompt budget")
+        sources = kept
+    sources_text = "\n".join(
+        budget.format_source(s) for s in sources
+    ) if sources else "Use your general knowledge."
+
+    prompt = build_prompt(tweet, sources_text)
+    request = {
+        'model': GROQ_MODEL,
+        'messages': [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ],
+        'max_tokens': budget.max_tokens_for(ARTICLE_WORDS),
+        'temperature': 0.7
+    }
+
+    # The prompt embeds the tweet and sources, so the request itself is the key
+    cache_key = hashlib.sha256(json.dumps(request, sort_keys=True).encode('utf-8')).hexdigest()
+    if not BYPASS_GENERATION_CACHE:
+        cached = generation_cache.get(cache_key)
+        if cached is not MISS:
+            print("  ♻️  Reusing cached article")
+            return cached
+
+    try:
+        ratelimit.acquire('groq')
+        if GROQ_STREAM:
+            article, generation = stream_completion(request)
+        else:
+            started = time.monotonic()
+            response = groq_completion(request)
+            article = response.choices[0].message.content
+            generation = {
+                'ttft': None,
+                'latency': time.monotonic() - started,
+                'prompt_tokens': response.usage.prompt_tokens if response.usage else None,
+                'tokens': response.usage.completion_tokens if response.usage else None,
+                'truncated': response.choices[0].finish_reason == 'length',
+            }
+        metrics.observe('groq_completion', generation['latency'])
+        if generation.get('ttft') is not None:
+            metrics.observe('groq_ttft', generation['ttft'])
+        print(f"  ⏱️  {format_generation_metrics(generation)}")
+
+        prompt_tokens = generation.get('prompt_tokens')
+        if prompt_tokens is None:
+            prompt_tokens = budget.estimate_tokens(system_prompt + prompt)
+        token_ledger.record(tweet['id'], prompt_tokens, generation.get('tokens'))
+        print(f"  🪙 Tokens: {prompt_tokens} prompt + {generation.get('tokens') or 0} completion")
+
+        # A cut-off article has no trailer and maybe half a paragraph; retry it later
+        if generation['truncated']:
+            metrics.count('groq_requests', outcome='truncated')
+            print(f"  ❌ Article cut off at {request['max_tokens']} tokens")
+            return None
         print("  ✅ Article generated!")
+        metrics.count('groq_requests', outcome='ok')
+        if article:
+            generation_cache.set(cache_key, article)
         return article
     except Exception as e:
+        metrics.count('groq_requests', outcome='error')
         print(f"  ❌ Error: {str(e)}")
         return None
 
+ARTICLE_TRAILER = 'Original Tweet:'
+
+def stream_completion(request):
+    """Stream a chat completion; returns (text, metrics).
+
+    Stops reading as soon as the "Original Tweet:" line is complete, since
+    that's the last thing the article format asks for. The text counts as
+    truncated if it hit the token limit or never reached that line.
+    """
+    started = time.monotonic()
+    first_token_at = None
+    parts = []
+    length = 0
+    searched = 0
+    trailer_at = -1
+    chunks = 0
+    tokens = None
+    prompt_tokens = None
+    finish_reason = None
+    stopped_early = False
+
+    stream = groq_completion(request, stream=True)
+    try:
+        for chunk in stream:
+            x_groq = getattr(chunk, 'x_groq', None)
+            if x_groq is not None and getattr(x_groq, 'usage', None):
+                tokens = x_groq.usage.completion_tokens
+                prompt_tokens = x_groq.usage.prompt_tokens
+            if chunk.choices and chunk.choices[0].finish_reason:
+                finish_reason = chunk.choices[0].finish_reason
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            parts.append(delta)
+            length += len(delta)
+            chunks += 1
+
+            text = None
+            if trailer_at < 0:
+                # Only rescan the new tail (plus overlap for a split marker)
+                text = ''.join(parts)
+                trailer_at = text.find(ARTICLE_TRAILER, max(0, searched - len(ARTICLE_TRAILER)))
+                searched = length
+            if trailer_at >= 0:
+                text = text or ''.join(parts)
+                line_start = trailer_at + len(ARTICLE_TRAILER)
+                rest = text[line_start:]
+                content_at = len(rest) - len(rest.lstrip())
+                line_end = rest.find('\n', content_at)
+                if rest.strip() and line_end >= 0:
+                    parts = [text[:line_start + line_end]]
+                    stopped_early = True
+                    break
+    finally:
+        stream.close()
+
+    latency = time.monotonic() - started
+    return ''.join(parts), {
+        'ttft': first_token_at - started if first_token_at else None,
+        'latency': latency,
+        'prompt_tokens': prompt_tokens,
+        # Groq reports usage in the final chunk; estimate from chunks if we stopped first
+        'tokens': tokens if tokens is not None else chunks,
+        'stopped_early': stopped_early,
+        'truncated': finish_reason == 'length' or trailer_at < 0,
+    }
+
+def format_generation_metrics(metrics):
+    parts = []
+    if metrics.get('ttft') is not None:
+        parts.append(f"TTFT {metrics['ttft']:.2f}s")
+    parts.append(f"total {metrics['latency']:.2f}s")
+    if metrics.get('tokens') and metrics['latency'] > 0:
+        parts.append(f"{metrics['tokens'] / metrics['latency']:.1f} tok/s")
+    if metrics.get('stopped_early'):
+        parts.append("stopped at trailer")
+    return ' • '.join(parts)
+
 # ============================================
 # GITHUB PAGES PUBLISHING
 # ============================================
@@ -372,149 +724,17 @@ def slugify(text):
 
 def create_article_html(article, tweet):
     """Convert article text to HTML page"""
-    blog_home = f"/{BLOG_REPO_NAME}/" if BLOG_REPO_NAME else "/"
-    lines = article.split('\n')
-    title_line = next(
-        (l for l in lines if l.strip().startswith('Title:')),
-        None
-    )
+    return renderer.render_article(article, tweet, BLOG_HOME)
 
-    if title_line:
-        title = title_line.replace('Title:', '').strip()
-        idx = lines.index(title_line) + 1
-        content = '\n'.join(lines[idx:]).strip()
-    else:
-        title = f"Article: {tweet['text'][:60]}"
-        content = article
-
-    # Convert markdown to HTML
-    content = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', content)
-    content = re.sub(
-        r'\[([^\]]+)\]\(([^\)]+)\)',
-        r'<a href="\2" target="_blank">\1</a>',
-        content
-    )
-
-    paragraphs = content.split('\n\n')
-    html_paragraphs = ''.join(
-        f'<p>{p.strip().replace(chr(10), "<br>")}</p>\n'
-        for p in paragraphs if p.strip()
-    )
-
-    date_str = datetime.now().strftime('%B %d, %Y')
-
-    html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: Georgia, 'Times New Roman', serif;
-            line-height: 1.8;
-            color: #333;
-            background: #fafafa;
-        }}
-        header {{
-            background: #1a1a2e;
-            color: white;
-            padding: 20px 40px;
-        }}
-        header a {{
-            color: #e0e0e0;
-            text-decoration: none;
-            font-size: 14px;
-        }}
-        header a:hover {{ color: white; }}
-        .article-container {{
-            max-width: 800px;
-            margin: 40px auto;
-            padding: 0 20px;
-        }}
-        .article-header {{
-            margin-bottom: 30px;
-            border-bottom: 3px solid #1a1a2e;
-            padding-bottom: 20px;
-        }}
-        h1 {{
-            font-size: 2em;
-            color: #1a1a2e;
-            line-height: 1.3;
-            margin-bottom: 10px;
-        }}
-        .meta {{
-            color: #888;
-            font-size: 14px;
-            font-family: Arial, sans-serif;
-        }}
-        .content p {{
-            margin-bottom: 20px;
-            font-size: 1.1em;
-        }}
-        .content a {{
-            color: #1a1a2e;
-        }}
-        .source-tweet {{
-            background: #f0f4ff;
-            border-left: 4px solid #1a1a2e;
-            padding: 15px 20px;
-            margin: 30px 0;
-            border-radius: 0 8px 8px 0;
-        }}
-        .source-tweet p {{
-            margin: 0;
-            font-size: 0.95em;
-        }}
-        .source-tweet a {{
-            color: #1a1a2e;
-            font-weight: bold;
-        }}
-        footer {{
-            text-align: center;
-            padding: 40px;
-            color: #888;
-            font-family: Arial, sans-serif;
-            font-size: 13px;
-            border-top: 1px solid #eee;
-            margin-top: 60px;
-        }}
-    </style>
-</head>
-<body>
-    <header>
-        <a href="{blog_home}">← Back to Home</a>
-    </header>
-
-    <div class="article-container">
-        <div class="article-header">
-            <h1>{title}</h1>
-            <p class="meta">Published on {date_str} • Auto-researched article</p>
-        </div>
-
-        <div class="content">
-            {html_paragraphs}
-        </div>
-
-        <div class="source-tweet">
-            <p>📌 <strong>Source Tweet:</strong> <a href="{tweet['url']}" target="_blank">{tweet['url']}</a></p>
-        </div>
-    </div>
-
-    <footer>
-        <p>Auto-generated article • {date_str}</p>
-    </footer>
-</body>
-</html>"""
-
-    return title, html
+def github_api(method, path, **kwargs):
+    """Call the GitHub API for the blog repo, paced by GitHub's rate limits"""
+    url = f"{GITHUB_API_URL}/repos/{BLOG_GITHUB_USERNAME}/{BLOG_REPO}/{path}"
+    return http_client.request(method, url, headers=GITHUB_HEADERS, provider='github', **kwargs)
 
 def get_existing_articles():
     """Get list of existing articles from GitHub"""
-    url = f"https://api.github.com/repos/{BLOG_GITHUB_USERNAME}/{BLOG_REPO}/contents/articles"
     try:
-        response = requests.get(url, headers=GITHUB_HEADERS, timeout=10)
+        response = github_api('GET', 'contents/articles', timeout=10)
         if response.status_code == 200:
             files = response.json()
             return [f['name'].replace('.html', '') for f in files if f['name'].endswith('.html')]
@@ -522,287 +742,705 @@ def get_existing_articles():
     except:
         return []
 
-def publish_to_github_pages(article, tweet):
-    """Publish article as HTML file to GitHub Pages"""
-    print("\n📤 Publishing to GitHub Pages...")
-
+def render_article(article, tweet):
+    """Render an article page; returns (title, filename, html)"""
     title, html_content = create_article_html(article, tweet)
     slug = slugify(title)
     filename = f"{slug}-{tweet['id'][:8]}.html"
+    return title, filename, html_content
+
+_publisher = None
+
+def get_publisher():
+    """The configured publishing backend (PUBLISHER)"""
+    global _publisher
+    if _publisher is None:
+        _publisher = publisher.create(PUBLISHER, github_api, LOCAL_SITE_DIR, LOCAL_SITE_GIT)
+    return _publisher
+
+def article_link(filename):
+    if PUBLISHER == 'local':
+        return os.path.join(LOCAL_SITE_DIR, 'articles', filename)
+    return f"https://{BLOG_REPO}/articles/{filename}"
+
+@metrics.timed('publish')
+def publish_article(article, tweet):
+    """Publish one article page, then update the homepage"""
+    print(f"\n📤 Publishing ({PUBLISHER})...")
+
+    title, filename, html_content = render_article(article, tweet)
     filepath = f"articles/{filename}"
 
     print(f"  Title: {title[:60]}")
     print(f"  File: {filepath}")
 
-    # Encode content to base64
-    encoded_content = base64.b64encode(html_content.encode('utf-8')).decode('utf-8')
+    try:
+        ensure_stylesheet()
+        get_publisher().write(filepath, html_content, f'Add article: {title[:50]}')
+    except Exception as e:
+        print(f"  ❌ Failed: {str(e)[:300]}")
+        return None
+
+    article_url = article_link(filename)
+    print(f"  ✅ Published! → {article_url}")
+    update_homepage(title, filename, tweet)
+    return {'link': article_url, 'title': title}
 
-    # Check if file exists
-    check_url = f"https://api.github.com/repos/{BLOG_GITHUB_USERNAME}/{BLOG_REPO}/contents/{filepath}"
-    check_response = requests.get(check_url, headers=GITHUB_HEADERS)
+_stylesheet_published = False
 
-    payload = {
-        'message': f'Add article: {title[:50]}',
-        'content': encoded_content,
-        'branch': 'main'
+def ensure_stylesheet():
+    """Compact output: publish the fingerprinted stylesheet if the site lacks it"""
+    global _stylesheet_published
+    if not renderer.compact() or _stylesheet_published:
+        return
+    path, css = renderer.stylesheet()
+    site = get_publisher()
+    if site.read(path) is None:
+        site.write(path, css, f'Add stylesheet {path}')
+        print(f"  🎨 Uploaded {path}")
+    _stylesheet_published = True
+
+def load_manifest():
+    """Get the article manifest, bootstrapping it from the old index.html once;
+    returns (entries, whether they were bootstrapped). Raises PublishError if
+    the site can't be read"""
+    site = get_publisher()
+    text = site.read(manifest.MANIFEST_PATH)
+    if text is not None:
+        return manifest.loads(text), False
+
+    print("  📋 No manifest yet, importing articles from index.html")
+    index_html = site.read('index.html')
+    if not index_html:
+        return [], True
+    match = re.search(r'<ul class="articles-list">(.*?)</ul>', index_html, re.DOTALL)
+    return (manifest.from_legacy_index(match.group(1)) if match else []), True
+
+def build_site_files(new_entries):
+    """Manifest plus the homepage/archive pages affected by the new entries"""
+    entries, bootstrapped = load_manifest()
+    # Legacy articles have no archive pages yet, so write them all once
+    previous_total = 0 if bootstrapped else len(entries)
+    entries.extend(new_entries)
+    files = manifest.render_pages(entries, previous_total, render_homepage)
+    files[manifest.MANIFEST_PATH] = manifest.dumps(entries)
+    return files
+
+@metrics.timed('update_homepage')
+def update_homepage(new_title, new_filename, tweet):
+    """Add the article to the manifest and re-render the affected pages"""
+    print("  📝 Updating homepage...")
+
+    entry = manifest.make_entry(new_title, new_filename, tweet['url'], section=tweet.get('section'))
+    site = get_publisher()
+    try:
+        # A failed read raises, so pages are never built from a partial manifest
+        files = build_site_files([entry])
+        manifest_text = files.pop(manifest.MANIFEST_PATH)
+        # Manifest last, so a failed page write is redone on the next attempt
+        for path, text in files.items():
+            site.write(path, text, f'Update {path} with: {new_title[:40]}')
+        site.write(manifest.MANIFEST_PATH, manifest_text, f'Add to manifest: {new_title[:40]}')
+    except PublishError as e:
+        print(f"  ❌ Homepage update failed: {str(e)[:200]}")
+        return
+    print(f"  ✅ Homepage updated! ({len(files)} page(s))")
+
+def stage_article(article, tweet):
+    """Batched publishers: render the article now, publish it with the rest later"""
+    title, filename, html_content = render_article(article, tweet)
+    print(f"\n📦 Staged: articles/{filename}")
+    return {
+        'title': title,
+        'filename': filename,
+        'html': html_content,
+        'tweet': tweet,
+        'link': article_link(filename),
     }
 
-    if check_response.status_code == 200:
-        payload['sha'] = check_response.json()['sha']
+@metrics.timed('publish_batch')
+def publish_batch(staged):
+    """Publish all staged articles and the updated homepage as one change"""
+    print(f"\n📤 Publishing {len(staged)} article(s) in one commit ({PUBLISHER})...")
+
+    def build_files():
+        files = {f"articles/{s['filename']}": s['html'] for s in staged}
+        if renderer.compact():
+            # Unchanged content maps to the same blob (or file), so re-sending it is free
+            path, css = renderer.stylesheet()
+            files[path] = css
+        files.update(build_site_files([
+            manifest.make_entry(s['title'], s['filename'], s['tweet']['url'],
+                                section=s['tweet'].get('section'))
+            for s in staged
+        ]))
+        return files
 
     try:
-        response = requests.put(
-            check_url,
-            headers=GITHUB_HEADERS,
-            json=payload,
-            timeout=30
+        sha = get_publisher().commit(
+            build_files,
+            f"Add {len(staged)} article(s): {staged[0]['title'][:40]}",
         )
+        print(f"  ✅ Committed {sha[:7]}" if sha else "  ✅ Written")
+        return True
+    except Exception as e:
+        print(f"  ❌ Batch publish failed: {str(e)[:200]}")
+        return False
 
-        print(f"  GitHub Response: {response.status_code}")
+def finish_publishing():
+    """End-of-run step of the publisher (the local git commit)"""
+    try:
+        sha = get_publisher().finish()
+        if sha:
+            print(f"  ✅ Site committed {sha[:7]}")
+    except PublishError as e:
+        print(f"  ❌ {str(e)[:200]}")
 
-        if response.status_code in [200, 201]:
-            article_url = f"https://{BLOG_REPO}/articles/{filename}"
-            print(f"  ✅ Published! → {article_url}")
-            update_homepage(title, filename, tweet)
-            return {'link': article_url, 'title': title}
-        else:
-            print(f"  ❌ Failed: {response.text[:300]}")
-            return None
+def render_homepage(heading, articles_html, nav_html=''):
+    """Render the homepage or an archive page around the given list items"""
+    return renderer.render_page(heading, articles_html, nav_html, BLOG_HOME)
 
-    except Exception as e:
-        print(f"  ❌ Error: {str(e)}")
-        return None
-
-def update_homepage(new_title, new_filename, tweet):
-    """Update the blog homepage with new article"""
-    print("  📝 Updating homepage...")
+# ============================================
+# PIPELINE
+# ============================================
 
-    # Get existing index.html
-    index_url = f"https://api.github.com/repos/{BLOG_GITHUB_USERNAME}/{BLOG_REPO}/contents/index.html"
-    existing_sha = None
-    existing_articles_html = ""
-
-    response = requests.get(index_url, headers=GITHUB_HEADERS)
-    if response.status_code == 200:
-        existing_sha = response.json()['sha']
-        existing_content = base64.b64decode(response.json()['content']).decode('utf-8')
-        # Extract existing articles list
-        match = re.search(r'<ul class="articles-list">(.*?)</ul>', existing_content, re.DOTALL)
+def drop_near_duplicates(tweets, similarity_index):
+    """Skip tweets whose text is a near-duplicate of a published article
+    or of an earlier tweet in this batch; returns (kept, skipped ids)"""
+    if not NEAR_DUPLICATE_CHECK:
+        return tweets, []
+    kept = []
+    skipped = []
+    batch_index = SimilarityIndex(path=None)
+    for tweet in tweets:
+        match = similarity_index.find(tweet)
         if match:
-            existing_articles_html = match.group(1).strip()
-
-    # Add new article to top of list
-    date_str = datetime.now().strftime('%B %d, %Y')
-    new_item = f'''        <li>
-            <span class="date">{date_str}</span>
-            <a href="articles/{new_filename}">{new_title}</a>
-            <span class="source"><a href="{tweet['url']}" target="_blank">source tweet</a></span>
-        </li>'''
-
-    updated_list = new_item + "\n" + existing_articles_html
-
-    homepage_html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>My Research Blog</title>
-    <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{
-            font-family: Arial, sans-serif;
-            background: #fafafa;
-            color: #333;
-        }}
-        header {{
-            background: #1a1a2e;
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }}
-        header h1 {{
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }}
-        header p {{
-            color: #aaa;
-            font-size: 1.1em;
-        }}
-        .container {{
-            max-width: 800px;
-            margin: 40px auto;
-            padding: 0 20px;
-        }}
-        h2 {{
-            font-size: 1.4em;
-            color: #1a1a2e;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #1a1a2e;
-        }}
-        .articles-list {{
-            list-style: none;
-        }}
-        .articles-list li {{
-            padding: 15px 0;
-            border-bottom: 1px solid #eee;
-            display: flex;
-            align-items: baseline;
-            gap: 15px;
-            flex-wrap: wrap;
-        }}
-        .articles-list a {{
-            color: #1a1a2e;
-            text-decoration: none;
-            font-size: 1.05em;
-            font-weight: bold;
-            flex: 1;
-        }}
-        .articles-list a:hover {{
-            text-decoration: underline;
-        }}
-        .date {{
-            color: #888;
-            font-size: 13px;
-            white-space: nowrap;
-        }}
-        .source {{
-            font-size: 12px;
-            color: #888;
-        }}
-        .source a {{
-            color: #888;
-            font-weight: normal !important;
-        }}
-        .empty {{
-            text-align: center;
-            padding: 60px;
-            color: #888;
-        }}
-        footer {{
-            text-align: center;
-            padding: 40px;
-            color: #888;
-            font-size: 13px;
-            border-top: 1px solid #eee;
-            margin-top: 40px;
-        }}
-    </style>
-</head>
-<body>
-    <header>
-        <h1>📰 My Research Blog</h1>
-        <p>Auto-researched articles from X/Twitter</p>
-    </header>
-
-    <div class="container">
-        <h2>Latest Articles</h2>
-        <ul class="articles-list">
-{updated_list}
-        </ul>
-    </div>
-
-    <footer>
-        <p>Powered by X → GitHub Pages Bot</p>
-    </footer>
-</body>
-</html>"""
-
-    encoded = base64.b64encode(homepage_html.encode('utf-8')).decode('utf-8')
-
-    payload = {
-        'message': f'Update homepage with: {new_title[:40]}',
-        'content': encoded,
-        'branch': 'main'
-    }
-    if existing_sha:
-        payload['sha'] = existing_sha
-
-    response = requests.put(
-        index_url,
-        headers=GITHUB_HEADERS,
-        json=payload,
-        timeout=30
-    )
+            print(f"  🔁 {tweet['id']} is a near-duplicate of {match['id']} "
+                  f"({match['distance']} bits) → {match.get('link', '')}")
+            similarity_index.add_duplicate(match['id'], tweet['id'])
+            skipped.append(str(tweet['id']))
+            continue
+        match = batch_index.find(tweet)
+        if match:
+            print(f"  🔁 {tweet['id']} is a near-duplicate of {match['id']} in this batch")
+            skipped.append(str(tweet['id']))
+            continue
+        batch_index.add(tweet)
+        kept.append(tweet)
+    return kept, skipped
+
+def process_tweets(tweets, published_ids, similarity_index, queue):
+    """Run research -> generate -> publish with a worker pool per stage.
+
+    Each stage hands its result to the next as soon as it completes, so a
+    batch takes roughly as long as its slowest stage; pacing comes from
+    the per-provider token buckets rather than fixed sleeps. Every tweet
+    starts at the stage after the last one the work queue recorded, and
+    each result or failure is recorded there.
+    """
+    success_count = 0
+    fail_count = 0
+    staged = []
+    batch = get_publisher().batched
+    publish = stage_article if batch else publish_article
+
+    def failed(tweet, stage, error):
+        nonlocal fail_count
+        fail_count += 1
+        if queue.fail(tweet['id'], stage, error):
+            print(f"  ☠️  {tweet['id']} moved to the dead-letter list after "
+                  f"{queue.max_attempts} failed attempts")
+
+    with ThreadPoolExecutor(RESEARCH_WORKERS) as research_pool, \
+            ThreadPoolExecutor(GENERATE_WORKERS) as generate_pool, \
+            ThreadPoolExecutor(PUBLISH_WORKERS) as publish_pool:
+        pending = {}
+        for i, tweet in enumerate(tweets, 1):
+            print(f"\n🧵 Tweet {i} of {len(tweets)}: {tweet['id']} - {tweet['text'][:80]}")
+            item = queue.get(tweet['id']) or {'stage': work_queue.FETCHED, 'attempts': 0}
+            if item['attempts']:
+                print(f"  ↪️  Retry {item['attempts']}, resuming after '{item['stage']}' "
+                      f"(last error: {item.get('last_error', '')[:60]})")
+            if item['stage'] == work_queue.GENERATED:
+                future = publish_pool.submit(publish, item['article'], tweet)
+                pending[future] = ('publish', tweet)
+            elif item['stage'] == work_queue.RESEARCHED:
+                future = generate_pool.submit(generate_article, tweet, item['sources'])
+                pending[future] = ('generate', tweet)
+            else:
+                future = research_pool.submit(research_topic, tweet.get('quoted_text') or tweet['text'])
+                pending[future] = ('research', tweet)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, tweet = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"  ❌ {stage} failed for {tweet['id']}: {str(e)[:80]}")
+                    failed(tweet, stage, e)
+                    continue
+
+                if stage == 'research':
+                    queue.advance(tweet['id'], work_queue.RESEARCHED, sources=result)
+                    next_future = generate_pool.submit(generate_article, tweet, result)
+                    pending[next_future] = ('generate', tweet)
+                elif stage == 'generate':
+                    if not result:
+                        failed(tweet, stage, 'no article generated')
+                        continue
+                    queue.advance(tweet['id'], work_queue.GENERATED, article=result)
+                    next_future = publish_pool.submit(publish, result, tweet)
+                    pending[next_future] = ('publish', tweet)
+                elif result and batch:
+                    staged.append(result)
+                elif result:
+                    queue.complete(tweet['id'])
+                    published_ids.append(str(tweet['id']))
+                    similarity_index.add(tweet, title=result['title'], link=result['link'])
+                    success_count += 1
+                    print(f"\n🎉 Tweet {tweet['id']} done! → {result['link']}")
+                else:
+                    failed(tweet, stage, 'publish failed')
+
+    if staged:
+        if publish_batch(staged):
+            for item in staged:
+                queue.complete(item['tweet']['id'])
+                published_ids.append(str(item['tweet']['id']))
+                similarity_index.add(item['tweet'], title=item['title'], link=item['link'])
+                print(f"🎉 Tweet {item['tweet']['id']} done! → {item['link']}")
+            success_count += len(staged)
+        else:
+            for item in staged:
+                failed(item['tweet'], 'publish', 'batch publish failed')
 
-    if response.status_code in [200, 201]:
-        print(f"  ✅ Homepage updated!")
-    else:
-        print(f"  ❌ Homepage update failed: {response.text[:200]}")
+    return success_count, fail_count
 
 # ============================================
 # MAIN
 # ============================================
 
-def main():
-    print("🔄 Fetching tweets...\n")
+def feed_matcher(account_feeds):
+    """Match function for the fetchers: one scan of the text against all of
+    the account's feeds, returning the rules that matched and the section of
+    the feed the tweet belongs to, or None"""
+    compiled = feeds.matcher(account_feeds)
 
-    tweets = fetch_via_syndication()
-    if not tweets:
-        tweets = fetch_via_rss_proxy()
-    if not tweets:
-        tweets = check_manual_tweets()
-
-    if not tweets:
+    def matches(text):
+        match = compiled.match(text)
+        if match is None:
+            return None
+        fields = {'matched': match.terms()}
+        if match.owner.section:
+            fields['section'] = match.owner.section
+        return fields
+    return matches
+
+def fetch_account(account_feeds, health):
+    """Syndication, then the Nitter race, for one account's feeds"""
+    account = account_feeds[0].account
+    matches = feed_matcher(account_feeds)
+    tweets = fetch_via_syndication(account, matches)
+    if tweets is None:
+        tweets = fetch_via_rss_proxy(health, account, matches)
+    return tweets
+
+def fetch_tweets():
+    """Fetch every configured account at once and merge the results, falling
+    back to manual_tweets.json if all of them failed. None means every
+    method failed; [] means the accounts answered with nothing new"""
+    accounts = feeds.by_account(get_feeds())
+    print(f"🔄 Fetching tweets for {len(accounts)} account(s)...\n")
+    health = NitterHealth()
+    try:
+        with ThreadPoolExecutor(min(FEED_WORKERS, max(1, len(accounts)))) as pool:
+            results = list(pool.map(lambda f: fetch_account(f, health), accounts.values()))
+    finally:
+        health.save()
+
+    fetched = [tweets for tweets in results if tweets is not None]
+    if len(fetched) < len(results):
+        print(f"\n⚠️  {len(results) - len(fetched)} of {len(results)} account(s) could not be fetched")
+    if not fetched:
+        return check_manual_tweets()
+
+    merged = []
+    seen = set()
+    for tweets in fetched:
+        for tweet in tweets:
+            if tweet['id'] not in seen:
+                seen.add(tweet['id'])
+                merged.append(tweet)
+    return merged
+
+def run():
+    tweets = fetch_tweets()
+
+    if tweets is None:
         print("\n⚠️  No tweets found.\n")
-        return
+    elif not tweets:
+        print("\n✅ No new tweets since last run!\n")
+    else:
+        metrics.gauge('tweets_fetched', len(tweets))
 
-    processed_ids = [
-        str(t['id']) if isinstance(t, dict) else str(t)
-        for t in get_processed_tweets()
-    ]
+    store = load_processed_store()
+    queue = WorkQueue()
 
     new_tweets = [
-        t for t in tweets
-        if str(t['id']) not in processed_ids
+        t for t in tweets or []
+        if not store.contains(t['id']) and not queue.known(t['id'])
     ]
 
-    if len(new_tweets) > 10:
-        print(f"⚠️  Found {len(new_tweets)} tweets, processing 10 per run")
-        new_tweets = new_tweets[:10]
-
-    if not new_tweets:
-        print(f"\n✅ All tweets already processed!\n")
+    similarity_index = SimilarityIndex()
+    new_tweets, duplicate_ids = drop_near_duplicates(new_tweets, similarity_index)
+    for tweet in new_tweets:
+        queue.enqueue(tweet)
+    if new_tweets:
+        print(f"📥 Queued {len(new_tweets)} new tweet(s)")
+
+    work = queue.due()
+    if len(work) > MAX_TWEETS_PER_RUN:
+        print(f"⚠️  {len(work)} tweets ready, processing {MAX_TWEETS_PER_RUN} per run")
+        work = work[:MAX_TWEETS_PER_RUN]
+
+    if not work:
+        queue.save()
+        store.add_many(duplicate_ids)
+        similarity_index.save()
+        if tweets is not None:
+            fetch_state.commit()
+        print(f"\n✅ Nothing to process ({len(queue)} tweet(s) waiting to retry)\n")
         return
 
-    print(f"\n📊 Processing {len(new_tweets)} tweet(s)...\n")
-
-    success_count = 0
-    fail_count = 0
-
-    for i, tweet in enumerate(new_tweets, 1):
-        print(f"\n{'='*40}")
-        print(f"TWEET {i} of {len(new_tweets)}")
-        print(f"{'='*40}")
-        print(f"ID:   {tweet['id']}")
-        print(f"Text: {tweet['text'][:100]}")
+    print(f"\n📊 Processing {len(work)} tweet(s)...\n")
 
-        sources = research_topic(tweet.get('quoted_text') or tweet['text'])
-        time.sleep(2)
+    # Near-duplicates count as processed so they aren't re-checked every run
+    published_ids = list(duplicate_ids)
 
-        article = generate_article(tweet, sources)
-        if not article:
-            fail_count += 1
-            continue
-
-        result = publish_to_github_pages(article, tweet)
-        if result:
-            save_processed_tweet(str(tweet['id']))
-            success_count += 1
-            print(f"\n🎉 Tweet {i} done! → {result['link']}")
-        else:
-            fail_count += 1
-
-        if i < len(new_tweets):
-            time.sleep(3)
+    try:
+        success_count, fail_count = process_tweets(work, published_ids, similarity_index, queue)
+        finish_publishing()
+    finally:
+        queue.save()
+        similarity_index.save()
+        research_cache.save()
+        generation_cache.save()
+        # Save the whole batch in a single append to the processed log
+        saved = store.add_many(published_ids)
+        if saved:
+            print(f"\n✅ Saved {saved} processed tweet(s)")
+        if store.needs_compaction():
+            store.compact()
+
+    # New tweets wait in the queue, so the fetch state can move past them
+    if tweets is not None:
+        fetch_state.commit()
+
+    metrics.gauge('queue_waiting', len(queue))
+    metrics.gauge('queue_dead', len(queue.dead))
+    metrics.gauge('tweets_published', success_count)
+    metrics.gauge('tweets_failed', fail_count)
+    metrics.gauge('tweets_near_duplicate', len(duplicate_ids))
+    for name, cache in (('research', research_cache), ('generation', generation_cache)):
+        stats = cache.stats()
+        metrics.gauge('cache_hits', stats['hits'], cache=name)
+        metrics.gauge('cache_misses', stats['misses'], cache=name)
 
     print("\n" + "="*50)
     print("📊 SUMMARY")
     print("="*50)
     print(f"  ✅ Success: {success_count}")
     print(f"  ❌ Failed:  {fail_count}")
+    print(f"  📥 Queue:          {len(queue)} waiting, {len(queue.dead)} dead-lettered")
+    stats = research_cache.stats()
+    print(f"  🔬 Research cache: {stats['hits']} hit(s), {stats['misses']} miss(es)")
+    stats = generation_cache.stats()
+    print(f"  ✍️  Article cache:  {stats['hits']} hit(s), {stats['misses']} miss(es)")
+    print(f"  🪙 Groq tokens:    {token_ledger.total()} ({token_ledger.prompt_tokens} prompt + "
+          f"{token_ledger.completion_tokens} completion) over {token_ledger.calls} call(s)")
+    for provider, windows in ratelimit.budget().items():
+        left = ', '.join(f"{name} {w['remaining']}/{w['limit']} (resets in {w['reset_in']:.0f}s)"
+                         for name, w in windows.items())
+        print(f"  🚦 {provider + ':':<15} {left}")
     print("="*50)
     print("🎉 BOT COMPLETE!\n")
 
+# ============================================
+# CLI
+# ============================================
+
+def tweet_from_args(args):
+    """Tweet dict for render/publish from --tweet-url (and optional --text)"""
+    url = args.tweet_url
+    return {
+        'id': url.rstrip('/').split('/')[-1],
+        'text': args.text or HASHTAG,
+        'quoted_text': '',
+        'url': url,
+    }
+
+def read_article(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def record_token_metrics():
+    """Groq token use for the run and per tweet, for the run report"""
+    metrics.gauge('groq_prompt_tokens', token_ledger.prompt_tokens)
+    metrics.gauge('groq_completion_tokens', token_ledger.completion_tokens)
+    metrics.gauge('groq_total_tokens', token_ledger.total())
+    for tweet_id, tokens in token_ledger.per_tweet.items():
+        metrics.gauge('groq_tweet_tokens', tokens['prompt'], tweet=tweet_id, kind='prompt')
+        metrics.gauge('groq_tweet_tokens', tokens['completion'], tweet=tweet_id, kind='completion')
+
+def cmd_run(args):
+    if PUBLISHER == 'local':
+        print(f"📝 Site will be written to: {LOCAL_SITE_DIR}/\n")
+    else:
+        print(f"📝 Blog will publish to: https://{BLOG_GITHUB_USERNAME}.github.io/{BLOG_REPO_NAME}/\n")
+    load_state()
+    try:
+        run()
+    finally:
+        # Written on every exit path, so failed and empty runs are measured too
+        record_token_metrics()
+        metrics.write_report()
+        print(f"📈 Metrics: {metrics.REPORT_FILE}, {metrics.OPENMETRICS_FILE}")
+
+def cmd_fetch(args):
+    """Fetch and list new tweets without processing them. The fetch state
+    isn't committed, so the next run still sees the same tweets"""
+    load_state()
+    tweets = fetch_tweets()
+    if tweets is None:
+        print("\n⚠️  No tweets found.\n")
+        return 1
+    store = ProcessedStore()
+    new_tweets = [t for t in tweets if not store.contains(t['id'])]
+    print(f"\n📋 {len(tweets)} fetched, {len(new_tweets)} new")
+    for tweet in new_tweets:
+        matched = ' '.join(tweet.get('matched', []))
+        print(f"  {tweet['id']}  [{matched}]  {tweet['text'][:80]}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(new_tweets, f, indent=2)
+        print(f"💾 Wrote {args.output}")
+
+def cmd_render(args):
+    """Render a generated article file to HTML locally"""
+    title, filename, html_content = render_article(read_article(args.article), tweet_from_args(args))
+    output = args.output or filename
+    with open(output, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    print(f"✅ {title[:60]} → {output}")
+
+def cmd_publish(args):
+    """Publish a generated article file to the blog"""
+    result = publish_article(read_article(args.article), tweet_from_args(args))
+    finish_publishing()
+    return 0 if result else 1
+
+def backfill_batch(batch, store, similarity_index, queue):
+    """Run one backfill batch through the pipeline; returns (published, failed)"""
+    tweets, duplicate_ids = drop_near_duplicates(batch, similarity_index)
+    for tweet in tweets:
+        queue.enqueue(tweet)
+    # Tweets already waiting (or dead) in the queue are left to it
+    tweets = [t for t in tweets if queue.get(t['id']) and not queue.get(t['id'])['attempts']]
+    published_ids = list(duplicate_ids)
+    try:
+        success_count, fail_count = (
+            process_tweets(tweets, published_ids, similarity_index, queue) if tweets else (0, 0))
+        finish_publishing()
+    finally:
+        queue.save()
+        similarity_index.save()
+        research_cache.save()
+        generation_cache.save()
+        store.add_many(published_ids)
+    return success_count, fail_count
+
+def cmd_backfill(args):
+    """Stream an archive or large tweet file through the pipeline in
+    checkpointed batches; an interrupted backfill resumes after the last
+    finished batch"""
+    load_state()
+    checkpoint = backfill.Checkpoint(args.file, args.checkpoint)
+    if args.restart:
+        checkpoint.clear()
+    if checkpoint.records:
+        print(f"⏩ Resuming after record {checkpoint.records} "
+              f"({checkpoint.published} published, {checkpoint.failed} failed so far)")
+
+    store = load_processed_store()
+    queue = WorkQueue()
+    similarity_index = SimilarityIndex()
+    # Throughput ceiling in tweets per minute, applied as tweets are queued
+    ceiling = ratelimit.TokenBucket(args.rate / 60, 1) if args.rate > 0 else None
+    # An archive holds one account's tweets; route them through its feeds
+    account = args.account or (get_feeds()[0].account if get_feeds() else X_USERNAME)
+    account_feeds = feeds.by_account(get_feeds()).get(account.lower())
+    if not account_feeds:
+        print(f"❌ No feed configured for @{account}")
+        return 1
+
+    matches = feed_matcher(account_feeds)
+
+    batch = []
+    queued = 0
+    records = 0
+
+    def flush():
+        success_count, fail_count = backfill_batch(batch, store, similarity_index, queue)
+        checkpoint.records = records
+        checkpoint.published += success_count
+        checkpoint.failed += fail_count
+        checkpoint.save()
+        batch.clear()
+        print(f"\n💾 Checkpoint: {records} records, {checkpoint.published} published, "
+              f"{checkpoint.failed} failed")
+
+    try:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            for record in backfill.iter_records(f):
+                records += 1
+                if records <= checkpoint.records:
+                    continue
+                tweet = backfill.to_tweet(record, account, matches)
+                if tweet and not store.contains(tweet['id']):
+                    if args.limit and queued >= args.limit:
+                        records -= 1
+                        break
+                    if ceiling:
+                        ceiling.acquire()
+                    batch.append(tweet)
+                    queued += 1
+                if len(batch) >= args.batch_size:
+                    flush()
+        if batch or records > checkpoint.records:
+            flush()
+    finally:
+        if store.needs_compaction():
+            store.compact()
+        record_token_metrics()
+        metrics.write_report()
+
+    print(f"\n✅ Backfill: {checkpoint.published} published, {checkpoint.failed} failed")
+    if checkpoint.failed:
+        print("  Failed tweets stay in the work queue and are retried by later runs")
+
+def cmd_queue(args):
+    """Show the work queue, or put dead-lettered tweets back into it"""
+    queue = WorkQueue()
+    if args.retry or args.retry_dead:
+        moved = queue.retry(None if args.retry_dead else args.retry)
+        queue.save()
+        print(f"↩️  {moved} tweet(s) moved back into the queue")
+
+    now = time.time()
+    print(f"📥 {len(queue)} queued, {len(queue.due(now))} due now, {len(queue.dead)} dead-lettered")
+    for title, items in (('Queued', queue.items), ('Dead-lettered', queue.dead)):
+        if not items:
+            continue
+        print(f"\n{title}:")
+        for tweet_id, item in sorted(items.items(), key=lambda kv: kv[1]['enqueued']):
+            wait = max(0, item['next_attempt'] - now) / 3600
+            when = f"retry in {wait:.1f}h" if wait and title == 'Queued' else ''
+            print(f"  {tweet_id:<22} {item['stage']:<11} {item['attempts']} attempt(s) {when}")
+            if item.get('last_error'):
+                print(f"    {item['last_error'][:100]}")
+
+def measure_startup(repeat):
+    """Cold-start cost: a fresh interpreter importing bot, against groq alone"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    cases = [
+        ('import bot', 'import bot'),
+        ('import groq', 'import groq'),
+    ]
+    print(f"{'case':<14} {'import ms':>10} {'process ms':>11}")
+    for name, statement in cases:
+        code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+        imports, processes = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = subprocess.run([sys.executable, '-c', code], cwd=here,
+                                    capture_output=True, text=True)
+            processes.append(time.perf_counter() - started)
+            if result.returncode != 0:
+                print(f"{name:<14} failed: {result.stderr.strip()[-200:]}")
+                break
+            imports.append(float(result.stdout.strip().splitlines()[-1]))
+        else:
+            print(f"{name:<14} {min(imports) * 1000:>10.1f} {min(processes) * 1000:>11.1f}")
+
+def cmd_bench(args):
+    """Cold-start measurement, or one of the scripts in benchmarks/"""
+    if args.benchmark == 'startup':
+        measure_startup(args.repeat)
+        return
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', f"bench_{args.benchmark}.py")
+    sys.argv = [script] + args.args
+    runpy.run_path(script, run_name='__main__')
+
+COMMANDS = {
+    'run': cmd_run,
+    'fetch': cmd_fetch,
+    'render': cmd_render,
+    'publish': cmd_publish,
+    'bench': cmd_bench,
+    'backfill': cmd_backfill,
+    'queue': cmd_queue,
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Turn hashtagged quote tweets into GitHub Pages articles.")
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.add_parser('run', help='fetch, research, generate and publish (default)')
+    fetch = commands.add_parser('fetch', help='list new tweets without processing them')
+    fetch.add_argument('--output', help='also write them as JSON (manual_tweets.json format)')
+    for name, help_text in (('render', 'render a generated article to HTML locally'),
+                            ('publish', 'publish a generated article to the blog')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('article', help='text file in the generated article format')
+        command.add_argument('--tweet-url', required=True)
+        command.add_argument('--text', help='tweet text (defaults to the hashtag)')
+        if name == 'render':
+            command.add_argument('--output', help='HTML file (defaults to the article slug)')
+    backfill_cmd = commands.add_parser('backfill', help='publish past tweets from an archive or tweet file')
+    backfill_cmd.add_argument('file', help='X archive tweets.js, JSON array or JSONL')
+    backfill_cmd.add_argument('--account', help='whose archive it is (default: the first feed\'s account)')
+    backfill_cmd.add_argument('--batch-size', type=int, default=25,
+                              help='tweets per pipeline batch and checkpoint (default 25)')
+    backfill_cmd.add_argument('--rate', type=float, default=0,
+                              help='throughput ceiling in tweets per minute (default: none)')
+    backfill_cmd.add_argument('--limit', type=int, default=0, help='stop after this many tweets')
+    backfill_cmd.add_argument('--checkpoint', default=backfill.CHECKPOINT_FILE)
+    backfill_cmd.add_argument('--restart', action='store_true', help='ignore the checkpoint')
+    queue_cmd = commands.add_parser('queue', help='show or retry tweets waiting in the work queue')
+    queue_cmd.add_argument('--retry', nargs='+', metavar='ID', help='re-queue these dead-lettered tweets')
+    queue_cmd.add_argument('--retry-dead', action='store_true', help='re-queue every dead-lettered tweet')
+    bench = commands.add_parser('bench', help='measure cold start or run a benchmark script')
+    bench.add_argument('benchmark', choices=('startup', 'render', 'rss', 'e2e', 'match'))
+    bench.add_argument('--repeat', type=int, default=5, help='startup runs')
+    bench.add_argument('args', nargs=argparse.REMAINDER, help='passed to the benchmark script')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or 'run'
+
+    if command == 'run':
+        print("\n" + "="*50)
+        print("🚀 X TO GITHUB PAGES BOT STARTED")
+        print("="*50 + "\n")
+    if REQUIRED_SECRETS[command]:
+        missing = check_config(command)
+        if missing:
+            print(f"\n❌ MISSING SECRETS: {', '.join(missing)}")
+            return 1
+        print(f"\n✅ All secrets loaded!")
+    return COMMANDS[command](args) or 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
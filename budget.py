@@ -0,0 +1,92 @@
+"""Prompt token budgeting and per-run token accounting for Groq calls.
+
+Token counts are estimated with the usual ~4 characters per token rule
+for English text, which is close enough to keep prompts inside a budget
+without pulling in a tokenizer. Real counts from Groq's ``usage`` data
+are recorded in a ``TokenLedger`` whenever the API reports them.
+"""
+import math
+import re
+import threading
+
+CHARS_PER_TOKEN = 4
+# Generated English prose runs ~1.3 tokens per word; the title, reference
+# list and tweet trailer add a roughly fixed amount on top
+TOKENS_PER_WORD = 1.4
+FORMAT_OVERHEAD_TOKENS = 300
+# Models often overshoot the word count they're asked for, and a cut-off
+# article is wasted, so the completion budget allows twice the length
+LENGTH_HEADROOM = 2
+# Below this many tokens a trimmed snippet isn't worth including
+MIN_SNIPPET_TOKENS = 20
+
+WORD = re.compile(r'[a-z0-9]{3,}')
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def max_tokens_for(words):
+    """Completion budget for an article of ``words`` words"""
+    return int(words * TOKENS_PER_WORD * LENGTH_HEADROOM) + FORMAT_OVERHEAD_TOKENS
+
+
+def format_source(source):
+    return f"- {source['title']}: {source['snippet']} (URL: {source['url']})"
+
+
+def rank_sources(sources, text):
+    """Order sources by word overlap with the tweet text, best first"""
+    words = set(WORD.findall(text.lower()))
+
+    def score(source):
+        source_words = set(WORD.findall(f"{source['title']} {source['snippet']}".lower()))
+        return len(words & source_words)
+
+    return sorted(sources, key=score, reverse=True)
+
+
+def fit_sources(sources, text, budget):
+    """Pick ranked sources whose formatted lines fit in ``budget`` tokens.
+
+    The first source that doesn't fit has its snippet trimmed into the
+    remaining room; everything after it is dropped.
+    """
+    chosen = []
+    remaining = budget
+    for source in rank_sources(sources, text):
+        cost = estimate_tokens(format_source(source)) + 1
+        if cost <= remaining:
+            chosen.append(source)
+            remaining -= cost
+            continue
+        overhead = estimate_tokens(format_source(dict(source, snippet=''))) + 1
+        room = remaining - overhead
+        if room >= MIN_SNIPPET_TOKENS:
+            chosen.append(dict(source, snippet=source['snippet'][:room * CHARS_PER_TOKEN].rstrip() + '…'))
+        break
+    return chosen
+
+
+class TokenLedger:
+    """Prompt/completion token counts per tweet and for the whole run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.per_tweet = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.calls = 0
+
+    def record(self, tweet_id, prompt_tokens, completion_tokens):
+        with self._lock:
+            entry = self.per_tweet.setdefault(str(tweet_id), {'prompt': 0, 'completion': 0})
+            entry['prompt'] += prompt_tokens or 0
+            entry['completion'] += completion_tokens or 0
+            self.prompt_tokens += prompt_tokens or 0
+            self.completion_tokens += completion_tokens or 0
+            self.calls += 1
+
+    def total(self):
+        return self.prompt_tokens + self.completion_tokens
@@ -0,0 +1,87 @@
+"""Small persistent key/value cache with TTL and LRU eviction.
+
+Entries live in memory in least-recently-used order and are written to
+a JSON file with ``save()``. Each entry expires after ``ttl`` seconds;
+empty results ("nothing found") can use a shorter ``negative_ttl`` so a
+miss is remembered without pinning it for as long as a real answer.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+
+class DiskCache:
+    def __init__(self, path, ttl, max_entries=1000, negative_ttl=None):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries = OrderedDict()
+        try:
+            with open(path, 'r') as f:
+                self._entries = OrderedDict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _expired(self, entry, now):
+        ttl = self.ttl if entry['value'] else self.negative_ttl
+        return now - entry['stored_at'] > ttl
+
+    def get(self, key):
+        """Return the cached value, or ``MISS``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry, time.time()):
+                if entry is not None:
+                    del self._entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['value']
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = {'value': value, 'stored_at': time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def delete(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            now = time.time()
+            entries = OrderedDict(
+                (k, e) for k, e in self._entries.items() if not self._expired(e, now)
+            )
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, self.path)
+            self._entries = entries
+            self._dirty = False
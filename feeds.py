@@ -0,0 +1,75 @@
+"""Feeds: which accounts to watch, for which hashtags, and where the
+resulting articles go.
+
+``feeds.json`` (FEEDS_FILE) lists one entry per feed:
+
+    [
+      {"account": "someone", "hashtags": ["#budget", "#policy"], "section": "economy"},
+      {"account": "other", "hashtags": "#elections", "keywords": ["polling day"],
+       "exclude": ["#ad"]}
+    ]
+
+Feeds of the same account share one timeline fetch and one compiled
+``matcher``; each matching tweet is routed to the first feed whose
+hashtags or keywords it carries (and none of its exclusions), and
+carries that feed's ``section`` into the manifest. Without a feeds file
+the bot runs the single feed given by X_USERNAME and HASHTAG.
+"""
+import json
+import os
+
+from matcher import Matcher, rules
+
+FEEDS_FILE = os.getenv('FEEDS_FILE', 'feeds.json')
+
+
+class Feed:
+    def __init__(self, account, hashtags, section='', keywords=(), exclude=()):
+        self.account = account.lstrip('@')
+        self.rules = rules(hashtags, keywords, exclude, owner=self)
+        self.hashtags = [rule.term for rule in self.rules if rule.kind == 'hashtag']
+        self.section = section or ''
+
+    def __repr__(self):
+        return f"Feed(@{self.account} {' '.join(self.hashtags)}{' → ' + self.section if self.section else ''})"
+
+
+def configured(path=FEEDS_FILE):
+    return os.path.exists(path)
+
+
+def load(path=FEEDS_FILE, account='', hashtag=''):
+    """Feeds from the config file, else the single ``account``/``hashtag``
+    feed (none if either is missing). Raises ValueError on a bad file."""
+    if not configured(path):
+        return [Feed(account, [hashtag])] if account and hashtag else []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{path}: {e}")
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: expected a list of feeds")
+
+    feeds = []
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get('account') or \
+                not (entry.get('hashtags') or entry.get('keywords')):
+            raise ValueError(f"{path}: feed {number} needs an account and hashtags or keywords")
+        feeds.append(Feed(entry['account'], entry.get('hashtags', ()), entry.get('section', ''),
+                          entry.get('keywords', ()), entry.get('exclude', ())))
+    return feeds
+
+
+def by_account(feeds):
+    """{account: [feeds]} in config order, so each timeline is fetched once"""
+    grouped = {}
+    for feed in feeds:
+        grouped.setdefault(feed.account.lower(), []).append(feed)
+    return grouped
+
+
+def matcher(account_feeds):
+    """One compiled matcher for all of an account's feeds; a match's
+    ``owner`` is the feed the tweet belongs to"""
+    return Matcher(rule for feed in account_feeds for rule in feed.rules)
@@ -0,0 +1,85 @@
+"""Conditional and incremental fetching state.
+
+Remembers, per source URL, the ETag / Last-Modified validators of the
+last fully processed response so the next request can be conditional
+(a quiet day costs a 304 and no parsing), and per account the newest
+tweet ID already seen so parsing can stop at the first known ID.
+
+Nothing learned during a run is committed until the run ends. Fetched
+tweets that were not processed (failed, or over the per-run cap) wait in
+the work queue, so the validators and since-IDs always move forward.
+"""
+import json
+import os
+import threading
+
+STATE_FILE = 'fetch_state.json'
+
+
+def _id(tweet_id):
+    try:
+        return int(tweet_id)
+    except (TypeError, ValueError):
+        return 0
+
+
+class FetchState:
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending_validators = {}
+        self._pending_newest = {}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.validators = data.get('validators', {})
+        self.since_ids = data.get('since_ids', {})
+
+    def headers_for(self, url):
+        """Conditional request headers for a URL we've fetched before"""
+        saved = self.validators.get(url, {})
+        headers = {}
+        if saved.get('etag'):
+            headers['If-None-Match'] = saved['etag']
+        if saved.get('last_modified'):
+            headers['If-Modified-Since'] = saved['last_modified']
+        return headers
+
+    def observe_response(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            with self._lock:
+                self._pending_validators[url] = {'etag': etag, 'last_modified': last_modified}
+
+    def since_id(self, account):
+        return _id(self.since_ids.get(account))
+
+    def is_known(self, account, tweet_id):
+        since = self.since_id(account)
+        return bool(since) and 0 < _id(tweet_id) <= since
+
+    def saw(self, account, tweet_id):
+        """Record a tweet ID seen in a timeline this run"""
+        value = _id(tweet_id)
+        with self._lock:
+            if value > self._pending_newest.get(account, 0):
+                self._pending_newest[account] = value
+
+    def commit(self):
+        """Persist this run's validators and since-IDs"""
+        with self._lock:
+            for account, newest in self._pending_newest.items():
+                if newest > self.since_id(account):
+                    self.since_ids[account] = str(newest)
+            self.validators.update(self._pending_validators)
+            self._pending_validators = {}
+            self._pending_newest = {}
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'validators': self.validators, 'since_ids': self.since_ids},
+                          f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
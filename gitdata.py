@@ -0,0 +1,65 @@
+"""Write many files to a GitHub branch as a single commit.
+
+Uses the Git Data API instead of the contents API: read the branch ref,
+create a tree on top of the current commit's tree, create one commit and
+move the ref to it. The ref update is a non-forced fast-forward, so if
+someone else pushed in the meantime GitHub rejects it and the whole
+sequence is retried on the new head (optimistic concurrency).
+
+``api(method, path, **kwargs)`` is any callable that sends a request
+relative to ``/repos/{owner}/{repo}/`` and returns a ``requests.Response``.
+"""
+import time
+
+
+class GitDataError(Exception):
+    pass
+
+
+def _check(response, what):
+    if response.status_code not in (200, 201):
+        raise GitDataError(f"{what} failed ({response.status_code}): {response.text[:200]}")
+    return response.json()
+
+
+def commit_files(api, build_files, message, branch='main', attempts=3):
+    """Commit ``build_files()`` ({path: text}) to ``branch`` in one commit.
+
+    ``build_files`` is called again on every attempt so content derived
+    from the live branch (e.g. the homepage) is rebuilt after a conflict.
+    Returns the new commit sha.
+    """
+    for attempt in range(1, attempts + 1):
+        ref = _check(api('GET', f"git/ref/heads/{branch}"), 'Read ref')
+        head_sha = ref['object']['sha']
+        head = _check(api('GET', f"git/commits/{head_sha}"), 'Read commit')
+
+        files = build_files()
+        # Inline content makes GitHub create the blobs as part of the tree call
+        entries = [
+            {'path': path, 'mode': '100644', 'type': 'blob', 'content': content}
+            for path, content in files.items()
+        ]
+        tree = _check(api('POST', 'git/trees', json={
+            'base_tree': head['tree']['sha'],
+            'tree': entries,
+        }, timeout=60), 'Create tree')
+
+        commit = _check(api('POST', 'git/commits', json={
+            'message': message,
+            'tree': tree['sha'],
+            'parents': [head_sha],
+        }), 'Create commit')
+
+        response = api('PATCH', f"git/refs/heads/{branch}", json={
+            'sha': commit['sha'],
+            'force': False,
+        })
+        if response.status_code == 200:
+            return commit['sha']
+        # 422 means the branch moved since we read it: not a fast-forward
+        if response.status_code != 422 or attempt == attempts:
+            _check(response, 'Update ref')
+        time.sleep(attempt)
+
+    raise GitDataError('Update ref failed: branch kept moving')
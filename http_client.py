@@ -0,0 +1,97 @@
+"""Shared HTTP client for every outbound call the bot makes.
+
+One ``requests.Session`` is kept per host so connections are pooled and
+reused (keep-alive) across calls. Every request gets a default
+(connect, read) timeout, idempotent methods are retried with backoff on
+connection errors and 5xx responses (not on read timeouts, which would
+hold a slow call for several timeouts), and responses are requested gzip
+compressed. A call can pass ``retries=`` to use its own retry policy,
+e.g. ``retries=0`` when racing hosts against a deadline. Calls, bytes received, retries and errors are counted per
+host in ``metrics``.
+
+Calls made for a rate-limited ``provider`` are paced by ``ratelimit``,
+feed it the provider's rate-limit headers, and are sent again (up to
+ratelimit.RETRIES times) after a 429 or rate-limit 403 once the
+provider's reset has passed.
+"""
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+import ratelimit
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 20
+DEFAULT_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+POOL_SIZE = 10
+RETRIES = Retry(
+    total=2,
+    connect=2,
+    read=False,
+    status=2,
+    backoff_factor=0.5,
+    status_forcelist=(500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD', 'DELETE', 'OPTIONS']),
+    raise_on_status=False,
+)
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def session_for(url, retries=None):
+    """Return the pooled session for the URL's scheme and host; ``retries``
+    (a count or a Retry) overrides the default RETRIES policy"""
+    parts = urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _lock:
+        session = _sessions.get((key, retries))
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=POOL_SIZE,
+                max_retries=RETRIES if retries is None else retries,
+            )
+            session.mount(key, adapter)
+            session.headers['Accept-Encoding'] = 'gzip, deflate'
+            _sessions[(key, retries)] = session
+        return session
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, provider=None, retries=None, **kwargs):
+    if provider is None:
+        return _send(method, url, timeout, retries, **kwargs)
+    for attempt in range(ratelimit.RETRIES + 1):
+        ratelimit.acquire(provider)
+        response = _send(method, url, timeout, retries, **kwargs)
+        wait = ratelimit.observe(provider, response.status_code, response.headers)
+        if not wait or attempt == ratelimit.RETRIES:
+            return response
+        print(f"  🚦 {provider} rate limited ({response.status_code}), retrying in {wait:.0f}s")
+
+
+def _send(method, url, timeout, retries, **kwargs):
+    if isinstance(timeout, (int, float)):
+        timeout = (min(CONNECT_TIMEOUT, timeout), timeout)
+    host = urlsplit(url).netloc
+    try:
+        response = session_for(url, retries).request(method, url, timeout=timeout, **kwargs)
+    except requests.RequestException as e:
+        metrics.count('http_errors', host=host, error=type(e).__name__)
+        raise
+    metrics.count('http_requests', host=host, method=method, status=response.status_code)
+    metrics.count('http_response_bytes', len(response.content), host=host)
+    retries = getattr(response.raw, 'retries', None)
+    if retries is not None and retries.history:
+        metrics.count('http_retries', len(retries.history), host=host)
+    return response
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
@@ -0,0 +1,138 @@
+"""Article manifest and paginated homepage rendering.
+
+The blog repo keeps ``articles.json``: one compact record per article
+(title, slug, date, tweet URL and, for feeds with one, the section),
+oldest first. The homepage and archive
+pages are rendered from it instead of being scraped out of the previous
+``index.html``.
+
+Archive pages are fixed-size chunks counted from the *oldest* article:
+``page/1.html`` holds articles 1..PAGE_SIZE, ``page/2.html`` the next
+chunk, and so on. Adding articles therefore only touches ``index.html``
+(the newest PAGE_SIZE articles), the last chunk(s) receiving the new
+entries, and the previous last page when a new chunk starts (its
+"newer" link changes). Older pages never need to be rewritten, and
+while every article fits on the homepage no archive page is written.
+"""
+import html
+import json
+import os
+import re
+from datetime import datetime
+
+MANIFEST_PATH = 'articles.json'
+PAGE_SIZE = max(1, int(os.getenv('HOMEPAGE_PAGE_SIZE', '20')))
+
+LEGACY_ITEM = re.compile(
+    r'<li>\s*<span class="date">(.*?)</span>\s*'
+    r'<a href="articles/([^"]+)">(.*?)</a>\s*'
+    r'<span class="source"><a href="([^"]*)"',
+    re.DOTALL
+)
+
+
+def make_entry(title, slug, tweet_url, date=None, section=None):
+    entry = {
+        'title': title,
+        'slug': slug,
+        'date': (date or datetime.now()).strftime('%Y-%m-%d'),
+        'tweet_url': tweet_url,
+    }
+    if section:
+        entry['section'] = section
+    return entry
+
+
+def loads(text):
+    return json.loads(text) if text and text.strip() else []
+
+
+def dumps(entries):
+    """One entry per line so each new article is a one-line diff"""
+    lines = [json.dumps(e, ensure_ascii=False, separators=(',', ':')) for e in entries]
+    return "[\n" + ",\n".join(lines) + "\n]\n"
+
+
+def from_legacy_index(articles_html):
+    """Build entries from the <li> items of an old scraped index.html"""
+    entries = []
+    for date_str, slug, title, tweet_url in LEGACY_ITEM.findall(articles_html):
+        try:
+            date = datetime.strptime(date_str.strip(), '%B %d, %Y')
+        except ValueError:
+            date = None
+        # Old pages stored titles raw-ish; keep plain text and escape on render
+        entries.append(make_entry(html.unescape(title.strip()), html.unescape(slug), html.unescape(tweet_url), date))
+    # The homepage lists newest first; the manifest is oldest first
+    entries.reverse()
+    return entries
+
+
+def page_count(total):
+    return (total + PAGE_SIZE - 1) // PAGE_SIZE
+
+
+def page_path(number):
+    return f"page/{number}.html"
+
+
+def item_html(entry, root=''):
+    date_str = datetime.strptime(entry['date'], '%Y-%m-%d').strftime('%B %d, %Y')
+    slug = html.escape(entry['slug'])
+    title = html.escape(entry['title'])
+    tweet_url = html.escape(entry['tweet_url'])
+    section = f'\n            <span class="section">{html.escape(entry["section"])}</span>' if entry.get('section') else ''
+    return f'''        <li>
+            <span class="date">{date_str}</span>{section}
+            <a href="{root}articles/{slug}">{title}</a>
+            <span class="source"><a href="{tweet_url}" target="_blank">source tweet</a></span>
+        </li>'''
+
+
+def items_html(entries, root=''):
+    return "\n".join(item_html(e, root) for e in reversed(entries))
+
+
+def dirty_pages(total, previous_total):
+    """Archive page numbers whose content or navigation changes"""
+    # Nothing links to the archive until the homepage overflows
+    if total == previous_total or total <= PAGE_SIZE:
+        return []
+    first = (previous_total - 1) // PAGE_SIZE if previous_total else 0
+    last = (total - 1) // PAGE_SIZE
+    return list(range(first + 1, last + 2))
+
+
+def render_pages(entries, previous_total, render_page):
+    """Return {path: html} for index.html and every archive page that changed.
+
+    ``render_page(heading, items_html, nav_html)`` renders one page.
+    """
+    total = len(entries)
+    pages = page_count(total)
+    files = {}
+
+    nav = ''
+    if total > PAGE_SIZE:
+        # The archive page holding the newest article not on the homepage
+        older = (total - PAGE_SIZE - 1) // PAGE_SIZE + 1
+        nav = f'<a href="{page_path(older)}">Older articles →</a>'
+    files['index.html'] = render_page(
+        'Latest Articles', items_html(entries[-PAGE_SIZE:]), nav
+    )
+
+    for number in dirty_pages(total, previous_total):
+        chunk = entries[(number - 1) * PAGE_SIZE:number * PAGE_SIZE]
+        links = []
+        if number < pages:
+            links.append(f'<a href="{number + 1}.html">← Newer</a>')
+        else:
+            links.append('<a href="../index.html">← Latest</a>')
+        if number > 1:
+            links.append(f'<a href="{number - 1}.html">Older →</a>')
+        files[page_path(number)] = render_page(
+            f'Archive: page {number}',
+            items_html(chunk, '../'),
+            ' '.join(links)
+        )
+    return files
@@ -0,0 +1,139 @@
+"""Compiled tweet matcher: hashtags, keywords and exclusions in one regex.
+
+Every rule of every feed goes into a single alternation, so a tweet is
+scanned once however many rules there are, and each hit is mapped back
+to its rules by the matched text. Terms only match as whole tokens:
+``#tag`` doesn't match inside ``#tagline``, the keyword ``tax`` doesn't
+match ``taxi``, and keywords don't match inside hashtags (``#tax``).
+Matching ignores case. Overlapping terms are all reported: at
+``tax cuts are coming`` both ``tax cuts`` and ``tax`` are found, so one
+feed's exclusion never hides a term another feed is looking for.
+
+The alternation is grouped by first character and each group starts
+with that literal character, so the regex engine can skip ahead to
+candidate positions instead of trying every one; the token boundary is
+checked by a lookbehind just after it. Each search resumes one
+character after the previous hit's start, and a hit also counts for the
+shorter terms it begins with, which together find every occurrence.
+
+A rule set's owner (a feed) matches a text when one of its hashtags or
+keywords is found and none of its own exclusions is.
+"""
+import re
+
+HASHTAG = 'hashtag'
+KEYWORD = 'keyword'
+EXCLUDE = 'exclude'
+
+# Not preceded or followed by a word character; a hashtag also can't be
+# the tail of a longer hashtag
+NOT_BEFORE = r'[\w#]'
+BOUNDARY_AFTER = r'(?!\w)'
+WORD = re.compile(r'\w')
+
+
+class Rule:
+    __slots__ = ('kind', 'term', 'owner')
+
+    def __init__(self, kind, term, owner=None):
+        self.kind = kind
+        self.term = term
+        self.owner = owner
+
+    def __repr__(self):
+        return f"Rule({self.kind} {self.term!r})"
+
+
+class Match:
+    """The owner that matched and the rules that were found for it"""
+    __slots__ = ('owner', 'rules')
+
+    def __init__(self, owner, rules):
+        self.owner = owner
+        self.rules = rules
+
+    def terms(self):
+        return [rule.term for rule in self.rules]
+
+
+def normalize_hashtag(tag):
+    return '#' + tag.strip().lstrip('#')
+
+
+def rules(hashtags=(), keywords=(), exclude=(), owner=None):
+    """Rules for one owner; a bare string counts as a single term"""
+    def terms(values):
+        return [values] if isinstance(values, str) else list(values or ())
+    return (
+        [Rule(HASHTAG, normalize_hashtag(t), owner) for t in terms(hashtags) if t.strip('# ')]
+        + [Rule(KEYWORD, t.strip(), owner) for t in terms(keywords) if t.strip()]
+        + [Rule(EXCLUDE, t.strip(), owner) for t in terms(exclude) if t.strip()]
+    )
+
+
+class Matcher:
+    def __init__(self, rule_list):
+        self.rules = list(rule_list)
+        self._by_term = {}
+        owners = []
+        for rule in self.rules:
+            self._by_term.setdefault(rule.term.lower(), []).append(rule)
+            if rule.owner not in owners:
+                owners.append(rule.owner)
+        # Owners are tried in the order their first rule was given
+        self._owners = owners
+        # A hit on "tax cuts" is also a hit on "tax": the shorter terms it
+        # begins with, each ending at a token boundary
+        self._terms_at = {
+            term: [term] + [term[:i] for i in range(1, len(term))
+                            if not WORD.match(term[i]) and term[:i] in self._by_term]
+            for term in self._by_term
+        }
+        groups = {}
+        for term in sorted(self._by_term, key=len, reverse=True):
+            groups.setdefault(term[0], []).append(term[1:])
+        branches = [
+            f"{re.escape(first)}(?<!{NOT_BEFORE}{re.escape(first)})(?:{'|'.join(map(re.escape, rests))})"
+            for first, rests in groups.items()
+        ]
+        # One group (e.g. only hashtags) keeps its literal prefix under
+        # IGNORECASE; with several, scanning lowered text is faster
+        self._lower = len(groups) > 1
+        self._pattern = re.compile(
+            f"(?:{'|'.join(branches)}){BOUNDARY_AFTER}",
+            0 if self._lower else re.IGNORECASE
+        ) if branches else None
+
+    def scan(self, text):
+        """Every rule found in the text, in order of first occurrence"""
+        if not text or self._pattern is None:
+            return []
+        if self._lower:
+            text = text.lower()
+        found = []
+        seen = set()
+        pos = 0
+        while True:
+            hit = self._pattern.search(text, pos)
+            if hit is None:
+                return found
+            # Not hit.end(): a term may start inside this one
+            pos = hit.start() + 1
+            for term in self._terms_at.get(hit.group().lower(), ()):
+                if term not in seen:
+                    seen.add(term)
+                    found.extend(self._by_term[term])
+
+    def match(self, text):
+        """First owner with an included term and no excluded one, or None"""
+        found = self.scan(text)
+        if not found:
+            return None
+        excluded = {rule.owner for rule in found if rule.kind == EXCLUDE}
+        for owner in self._owners:
+            if owner in excluded:
+                continue
+            hits = [rule for rule in found if rule.owner is owner and rule.kind != EXCLUDE]
+            if hits:
+                return Match(owner, hits)
+        return None
@@ -0,0 +1,170 @@
+"""Run metrics: timing spans, counters and the end-of-run report.
+
+Stages are timed with ``span(name)`` (a context manager) or the
+``timed(name)`` decorator; ``count`` and ``gauge`` record labelled
+values (HTTP calls, bytes, retries, cache hits, ...). At the end of a
+run ``write_report`` saves everything as a JSON run report and as an
+OpenMetrics text file that Prometheus-style tooling can ingest.
+"""
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+REPORT_FILE = os.getenv('METRICS_REPORT', 'run_report.json')
+OPENMETRICS_FILE = os.getenv('METRICS_OPENMETRICS', 'metrics.prom')
+PREFIX = 'xbot'
+
+_lock = threading.Lock()
+_spans = {}
+_counters = {}
+_gauges = {}
+_started = time.monotonic()
+_started_at = datetime.now(timezone.utc)
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def observe(name, seconds):
+    """Record one finished span"""
+    with _lock:
+        _spans.setdefault(name, []).append(seconds)
+
+
+@contextmanager
+def span(name):
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        observe(name, time.monotonic() - started)
+
+
+def timed(name):
+    """Decorator form of ``span``"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _span_stats(durations):
+    durations = sorted(durations)
+    return {
+        'count': len(durations),
+        'total': sum(durations),
+        'min': durations[0],
+        'p50': _percentile(durations, 0.5),
+        'p95': _percentile(durations, 0.95),
+        'max': durations[-1],
+    }
+
+
+def _labelled(values):
+    return [dict(labels, name=name, value=value) for (name, labels), value in sorted(values.items())]
+
+
+def snapshot():
+    """Everything recorded so far, as plain data"""
+    with _lock:
+        return {
+            'started_at': _started_at.isoformat(timespec='seconds'),
+            'duration': time.monotonic() - _started,
+            'spans': {name: _span_stats(d) for name, d in sorted(_spans.items())},
+            'counters': _labelled(_counters),
+            'gauges': _labelled(_gauges),
+        }
+
+
+def _metric_name(name):
+    return f"{PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_label_value(v)}"' for k, v in sorted(labels.items())) + '}'
+
+
+def openmetrics(report):
+    """Render a snapshot in the OpenMetrics text format"""
+    lines = []
+    if report['spans']:
+        name = _metric_name('stage_duration_seconds')
+        lines.append(f"# TYPE {name} summary")
+        lines.append(f"# UNIT {name} seconds")
+        for stage, stats in report['spans'].items():
+            for key, quantile in (('p50', '0.5'), ('p95', '0.95')):
+                labels = _label_text({'stage': stage, 'quantile': quantile})
+                lines.append(f"{name}{labels} {stats[key]:.6f}")
+            lines.append(f"{name}_sum{_label_text({'stage': stage})} {stats['total']:.6f}")
+            lines.append(f"{name}_count{_label_text({'stage': stage})} {stats['count']}")
+
+    for kind, items in (('counter', report['counters']), ('gauge', report['gauges'])):
+        declared = set()
+        for item in items:
+            labels = {k: v for k, v in item.items() if k not in ('name', 'value')}
+            name = _metric_name(item['name'])
+            if name not in declared:
+                lines.append(f"# TYPE {name} {kind}")
+                declared.add(name)
+            sample = f"{name}_total" if kind == 'counter' else name
+            lines.append(f"{sample}{_label_text(labels)} {item['value']}")
+
+    name = _metric_name('run_duration_seconds')
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"{name} {report['duration']:.3f}")
+    lines.append("# EOF")
+    return '\n'.join(lines) + '\n'
+
+
+def write_report(path=REPORT_FILE, openmetrics_path=OPENMETRICS_FILE):
+    """Write the JSON run report and the OpenMetrics file; returns the report"""
+    report = snapshot()
+    for target, text in ((path, json.dumps(report, indent=2)), (openmetrics_path, openmetrics(report))):
+        if not target:
+            continue
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(text)
+        os.replace(tmp_path, target)
+    return report
+
+
+def reset():
+    """Forget everything recorded so far (for tools that run several passes)"""
+    global _started, _started_at
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _gauges.clear()
+        _started = time.monotonic()
+        _started_at = datetime.now(timezone.utc)
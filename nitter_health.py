@@ -0,0 +1,157 @@
+"""Persistent health scoreboard for Nitter instances.
+
+Each instance keeps a success/failure count, an EWMA of response latency,
+the time of its last failure and a circuit-breaker state:
+
+  closed     -> normal, tried every run
+  open       -> skipped until the cooldown has passed
+  half-open  -> cooldown passed, gets one trial request
+
+The table is loaded at the start of a run, used to order (and skip)
+instances, updated with every result, and written back at the end.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+HEALTH_FILE = 'nitter_health.json'
+INSTANCES_FILE = 'nitter_instances.json'
+
+DEFAULT_INSTANCES = [
+    'https://nitter.net',
+    'https://nitter.poast.org',
+    'https://nitter.privacydev.net',
+    'https://nitter.lucabased.xyz',
+    'https://nitter.lunar.icu',
+    'https://nitter.rawbit.ninja',
+    'https://nitter.mint.lgbt',
+    'https://nitter.bus-hit.me',
+    'https://tweet.namejeff.com',
+    'https://nitter.nicfab.eu',
+]
+
+EWMA_ALPHA = 0.3
+FAILURE_THRESHOLD = int(os.getenv('NITTER_CIRCUIT_FAILURES', '3'))
+COOLDOWN = timedelta(hours=float(os.getenv('NITTER_CIRCUIT_COOLDOWN_HOURS', '72')))
+# Latency assumed for instances we have never timed, and the latency a
+# failure is charged (a fast refusal is still a wasted attempt), in seconds
+UNKNOWN_LATENCY = 5.0
+FAILURE_LATENCY = 10.0
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def load_instances(path=INSTANCES_FILE):
+    """Instance list from NITTER_INSTANCES (comma separated), the config file, or defaults"""
+    env = os.getenv('NITTER_INSTANCES', '')
+    if env.strip():
+        return [i.strip().rstrip('/') for i in env.split(',') if i.strip()]
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        instances = [i.strip().rstrip('/') for i in data if i.strip()]
+        if instances:
+            return instances
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return list(DEFAULT_INSTANCES)
+
+
+class NitterHealth:
+    """Health table keyed by instance URL"""
+
+    def __init__(self, path=HEALTH_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as f:
+                self.table = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.table = {}
+
+    def _entry(self, instance):
+        return self.table.setdefault(instance, {
+            'successes': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'ewma_latency': None,
+            'last_success': None,
+            'last_failure': None,
+            'state': CLOSED,
+            'opened_at': None,
+        })
+
+    def state(self, instance, now=None):
+        entry = self.table.get(instance)
+        if not entry:
+            return CLOSED
+        if entry['state'] == OPEN:
+            now = now or datetime.now()
+            opened_at = datetime.fromisoformat(entry['opened_at'])
+            if now - opened_at >= COOLDOWN:
+                return HALF_OPEN
+        return entry['state']
+
+    def expected_cost(self, instance):
+        """Expected seconds spent per successful fetch; lower is better"""
+        entry = self.table.get(instance)
+        if not entry:
+            return UNKNOWN_LATENCY / 0.5
+        # Laplace-smoothed success rate so new instances aren't starved
+        rate = (entry['successes'] + 1) / (entry['successes'] + entry['failures'] + 2)
+        latency = entry['ewma_latency'] if entry['ewma_latency'] is not None else UNKNOWN_LATENCY
+        return latency / rate
+
+    def order(self, instances, now=None):
+        """Return (ordered instances to try, instances skipped by an open circuit)"""
+        candidates = []
+        skipped = []
+        for instance in instances:
+            state = self.state(instance, now)
+            if state == OPEN:
+                skipped.append(instance)
+                continue
+            if state == HALF_OPEN:
+                self._entry(instance)['state'] = HALF_OPEN
+            candidates.append(instance)
+        candidates.sort(key=self.expected_cost)
+        return candidates, skipped
+
+    def _observe_latency(self, entry, latency):
+        if entry['ewma_latency'] is None:
+            entry['ewma_latency'] = latency
+        else:
+            entry['ewma_latency'] = EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * entry['ewma_latency']
+
+    def record_success(self, instance, latency):
+        with self._lock:
+            entry = self._entry(instance)
+            entry['successes'] += 1
+            entry['consecutive_failures'] = 0
+            self._observe_latency(entry, latency)
+            entry['last_success'] = datetime.now().isoformat()
+            entry['state'] = CLOSED
+            entry['opened_at'] = None
+
+    def record_failure(self, instance, latency=0.0):
+        with self._lock:
+            entry = self._entry(instance)
+            now = datetime.now()
+            entry['failures'] += 1
+            entry['consecutive_failures'] += 1
+            self._observe_latency(entry, max(latency, FAILURE_LATENCY))
+            entry['last_failure'] = now.isoformat()
+            # A failed half-open trial re-opens the circuit immediately
+            if entry['state'] == HALF_OPEN or entry['consecutive_failures'] >= FAILURE_THRESHOLD:
+                entry['state'] = OPEN
+                entry['opened_at'] = now.isoformat()
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.table, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,193 @@
+"""Publishing backends: where the generated site is written.
+
+Every backend offers the same small interface, so the pipeline doesn't
+care whether a page ends up in GitHub or on disk:
+
+    read(path)                      current text of a site file, None if it
+                                    doesn't exist; PublishError if it can't
+                                    be read
+    write(path, text, message)      create or replace one file
+    commit(build_files, message)    write many files as one change
+    finish()                        end of run (e.g. the local git commit)
+
+``batched`` backends are handed all of a run's articles at once through
+``commit``; the others publish article by article with ``write``.
+
+Backends (``PUBLISHER``):
+
+    github-contents   contents API, one request per file (the default)
+    github-batch      Git Data API, one commit per run (see gitdata)
+    local             files under LOCAL_SITE_DIR, optionally committed to
+                      a local git repo once per run so one push deploys it
+"""
+import base64
+import os
+import subprocess
+
+import gitdata
+
+BACKENDS = ('github-contents', 'github-batch', 'local')
+# Committer for local site commits when git has no identity configured
+COMMITTER = 'x-to-pages-bot'
+
+
+class PublishError(Exception):
+    pass
+
+
+class GitHubContentsPublisher:
+    """One contents API request per file; ``api`` is bot.github_api.
+
+    Blob shas seen in reads and writes are remembered, so updating a file
+    that was just read or written needs no extra GET for its sha.
+    """
+    batched = False
+
+    def __init__(self, api, branch='main'):
+        self.api = api
+        self.branch = branch
+        self._shas = {}
+
+    def _get(self, path):
+        """(sha, text) of a file, (None, None) if it doesn't exist"""
+        response = self.api('GET', f"contents/{path}")
+        if response.status_code == 404:
+            return None, None
+        if response.status_code != 200:
+            raise PublishError(f"Reading {path} failed ({response.status_code}): {response.text[:200]}")
+        data = response.json()
+        content = data['content']
+        if not content and data.get('encoding') == 'none':
+            # Files over 1 MB come without content; the blobs API has it
+            blob = self.api('GET', f"git/blobs/{data['sha']}")
+            if blob.status_code != 200:
+                raise PublishError(f"Reading {path} blob failed ({blob.status_code}): {blob.text[:200]}")
+            content = blob.json()['content']
+        return data['sha'], base64.b64decode(content).decode('utf-8')
+
+    def read(self, path):
+        sha, text = self._get(path)
+        self._shas[path] = sha
+        return text
+
+    def _put(self, path, sha, text, message):
+        payload = {
+            'message': message,
+            'content': base64.b64encode(text.encode('utf-8')).decode('utf-8'),
+            'branch': self.branch
+        }
+        if sha:
+            payload['sha'] = sha
+        return self.api('PUT', f"contents/{path}", json=payload, timeout=30)
+
+    def write(self, path, text, message):
+        known = path in self._shas
+        sha = self._shas.pop(path) if known else self._get(path)[0]
+        response = self._put(path, sha, text, message)
+        if known and response.status_code in (409, 422):
+            # The remembered sha is stale: someone else changed the file
+            response = self._put(path, self._get(path)[0], text, message)
+        if response.status_code not in (200, 201):
+            raise PublishError(f"{path}: {response.status_code} {response.text[:200]}")
+        self._shas[path] = response.json().get('content', {}).get('sha')
+
+    def commit(self, build_files, message):
+        # Files go out in order, so callers put the manifest last
+        for path, text in build_files().items():
+            self.write(path, text, f"{message} ({path})")
+
+    def finish(self):
+        pass
+
+
+class GitHubBatchPublisher(GitHubContentsPublisher):
+    """Reads through the contents API, writes one Git Data API commit per call"""
+    batched = True
+
+    def write(self, path, text, message):
+        self.commit(lambda: {path: text}, message)
+
+    def commit(self, build_files, message):
+        try:
+            return gitdata.commit_files(self.api, build_files, message, branch=self.branch)
+        except gitdata.GitDataError as e:
+            raise PublishError(str(e))
+
+
+class LocalPublisher:
+    """Site tree in a local directory; with ``git`` the run ends in one commit"""
+    batched = True
+
+    def __init__(self, root, git=False):
+        self.root = root
+        self.git = git
+        self.messages = []
+
+    def _path(self, path):
+        root = os.path.abspath(self.root)
+        full = os.path.abspath(os.path.join(root, path))
+        if full == root or os.path.commonpath([root, full]) != root:
+            raise PublishError(f"{path}: outside the site directory")
+        return full
+
+    def read(self, path):
+        try:
+            with open(self._path(path), 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, path, text):
+        full = self._path(path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        tmp_path = f"{full}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, full)
+
+    def write(self, path, text, message):
+        self._store(path, text)
+        self.messages.append(message)
+
+    def commit(self, build_files, message):
+        for path, text in build_files().items():
+            self._store(path, text)
+        self.messages.append(message)
+
+    def _git(self, *args):
+        result = subprocess.run(['git', '-C', self.root, *args], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise PublishError(f"git: {result.stderr.strip()[:200]}")
+        return result.stdout
+
+    def _identity(self):
+        """Fallback committer for machines without a git identity"""
+        result = subprocess.run(['git', '-C', self.root, 'config', 'user.email'], capture_output=True)
+        if result.returncode == 0:
+            return ()
+        return ('-c', f'user.name={COMMITTER}', '-c', f'user.email={COMMITTER}@users.noreply.github.com')
+
+    def finish(self):
+        """Commit everything written this run to the local repo"""
+        if not self.git or not self.messages:
+            return None
+        if not os.path.isdir(os.path.join(self.root, '.git')):
+            self._git('init', '-q', '-b', 'main')
+        self._git('add', '-A')
+        if not self._git('status', '--porcelain').strip():
+            return None
+        summary = self.messages[0] if len(self.messages) == 1 else f"Publish {len(self.messages)} change(s)"
+        self._git(*self._identity(), 'commit', '-q', '-m', summary, '-m', '\n'.join(self.messages))
+        self.messages = []
+        return self._git('rev-parse', 'HEAD').strip()
+
+
+def create(kind, api, local_dir='site', local_git=False):
+    """Backend for a PUBLISHER value"""
+    if kind == 'github-contents':
+        return GitHubContentsPublisher(api)
+    if kind == 'github-batch':
+        return GitHubBatchPublisher(api)
+    if kind == 'local':
+        return LocalPublisher(local_dir, git=local_git)
+    raise ValueError(f"Unknown publisher {kind!r}, expected one of: {', '.join(BACKENDS)}")
@@ -0,0 +1,277 @@
+"""Per-provider token buckets used to pace outbound API calls.
+
+Each provider gets a bucket that refills at ``rate`` tokens per second up
+to ``capacity``. ``acquire(provider)`` blocks only as long as needed for a
+token to be available, so calls run back-to-back while a provider is
+under its limit instead of sleeping a fixed amount every time.
+
+Rates can be overridden with RATE_LIMIT_<PROVIDER> (tokens per second),
+e.g. RATE_LIMIT_GROQ=0.25.
+
+On top of the fixed buckets, a ``Governor`` per provider follows the
+limits the provider itself reports. ``observe`` reads the rate-limit
+headers of every response (GitHub's ``X-RateLimit-*``, Groq's
+``x-ratelimit-*-requests``/``-tokens`` and ``retry-after``), and
+``acquire`` then:
+
+* spaces calls out once less than RATE_LIMIT_SLOW_BELOW (default 10%) of
+  a window is left, so the rest lasts until the window resets
+* waits until the reset when a window is used up, or for ``retry-after``
+  after a 429 (or a 403 rate-limit response from GitHub)
+* raises ``RateLimited`` instead when that wait would be longer than
+  RATE_LIMIT_MAX_WAIT seconds (default 900), leaving the work for a
+  later run
+
+``budget()`` reports what each provider has left.
+"""
+import os
+import re
+import threading
+import time
+
+import metrics
+
+# provider: (tokens per second, burst capacity)
+DEFAULT_LIMITS = {
+    'duckduckgo': (1.0, 2),
+    # Groq free tier allows 30 requests per minute
+    'groq': (0.5, 2),
+    # Stay well under GitHub's secondary limit on content-creating requests
+    'github': (1.0, 3),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Block until ``tokens`` are available; returns the seconds waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+SLOW_BELOW = float(os.getenv('RATE_LIMIT_SLOW_BELOW', '0.1'))
+MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '900'))
+# How often a rate-limited request is sent again after waiting
+RETRIES = int(os.getenv('RATE_LIMIT_RETRIES', '2'))
+# GitHub asks for at least a minute when a secondary limit names no time
+DEFAULT_BACKOFF = 60.0
+
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+class RateLimited(Exception):
+    def __init__(self, provider, wait):
+        super().__init__(f"{provider} rate limit exhausted, resets in {wait:.0f}s")
+        self.provider = provider
+        self.wait = wait
+
+
+class Window:
+    """One reported limit, e.g. GitHub's core requests or Groq's tokens"""
+    __slots__ = ('limit', 'remaining', 'reported', 'reset_at', 'cost', 'calls')
+
+    def __init__(self, limit, remaining, reset_at):
+        self.limit = limit
+        self.remaining = remaining
+        self.reported = remaining
+        self.reset_at = reset_at
+        # Budget used per call, learned from how far the reported
+        # remaining drops across the calls made in between
+        self.cost = 1.0
+        self.calls = 0
+
+
+class Governor:
+    def __init__(self, provider, slow_below=SLOW_BELOW, max_wait=MAX_WAIT):
+        self.provider = provider
+        self.slow_below = slow_below
+        self.max_wait = max_wait
+        self.windows = {}
+        self.blocked_until = 0.0
+        self._next_call = 0.0
+        self._lock = threading.Lock()
+
+    def update(self, name, limit, remaining, reset_in):
+        now = time.monotonic()
+        with self._lock:
+            window = self.windows.get(name)
+            if window is None or now >= window.reset_at:
+                self.windows[name] = Window(limit, remaining, now + reset_in)
+                return
+            used = window.reported - remaining
+            if used > 0 and window.calls:
+                window.cost = 0.8 * window.cost + 0.2 * used / window.calls
+            window.limit = limit
+            window.remaining = window.reported = remaining
+            window.reset_at = now + reset_in
+            window.calls = 0
+
+    def block(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def _reserve(self, now):
+        """Seconds until the next call may go out; books the call"""
+        wait = max(0.0, self.blocked_until - now)
+        interval = 0.0
+        for window in self.windows.values():
+            reset_in = window.reset_at - now
+            if reset_in <= 0:
+                continue
+            if window.remaining < window.cost:
+                wait = max(wait, reset_in)
+            elif window.remaining < window.limit * self.slow_below:
+                # Spread what's left evenly over the rest of the window
+                interval = max(interval, reset_in * window.cost / window.remaining)
+        if wait > self.max_wait:
+            raise RateLimited(self.provider, wait)
+        start = max(now + wait, self._next_call)
+        self._next_call = start + interval
+        # Count the call against every window until the next response says otherwise
+        for window in self.windows.values():
+            window.remaining -= window.cost
+            window.calls += 1
+        return start - now
+
+    def wait(self):
+        """Block until the provider's limits allow another call; returns the seconds waited"""
+        with self._lock:
+            delay = self._reserve(time.monotonic())
+        if delay > 0:
+            metrics.count('rate_limit_waits', provider=self.provider)
+            metrics.count('rate_limit_wait_seconds', round(delay, 3), provider=self.provider)
+            time.sleep(delay)
+        return delay
+
+    def budget(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    'limit': window.limit,
+                    'remaining': max(0, int(window.remaining)),
+                    'reset_in': max(0.0, window.reset_at - now),
+                }
+                for name, window in self.windows.items()
+            }
+
+
+def parse_duration(value):
+    """Seconds in a Groq reset value such as 7.66s, 2m59.56s or 120ms"""
+    try:
+        return float(value)
+    except ValueError:
+        return sum(float(n) * DURATION_SECONDS[unit] for n, unit in DURATION_PART.findall(value))
+
+
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def observe(provider, status, headers):
+    """Feed a response's rate-limit headers to the provider's governor.
+
+    Returns the seconds to back off when the response was itself rate
+    limited (the governor then holds further calls back as well), else 0.
+    """
+    gov = governor(provider)
+    now = time.time()
+    exhausted = None
+
+    # GitHub: X-RateLimit-Limit/-Remaining/-Reset (epoch) per resource
+    limit = _int(headers.get('x-ratelimit-limit'))
+    remaining = _int(headers.get('x-ratelimit-remaining'))
+    if limit is not None and remaining is not None:
+        reset_in = max(0.0, (_int(headers.get('x-ratelimit-reset')) or now) - now)
+        name = headers.get('x-ratelimit-resource', 'core')
+        gov.update(name, limit, remaining, reset_in)
+        metrics.gauge('rate_limit_remaining', remaining, provider=provider, window=name)
+        if remaining == 0:
+            exhausted = reset_in
+
+    # Groq: x-ratelimit-{limit,remaining,reset}-{requests,tokens}
+    for name in ('requests', 'tokens'):
+        limit = _int(headers.get(f'x-ratelimit-limit-{name}'))
+        remaining = _int(headers.get(f'x-ratelimit-remaining-{name}'))
+        if limit is None or remaining is None:
+            continue
+        reset_in = parse_duration(headers.get(f'x-ratelimit-reset-{name}', '0'))
+        gov.update(name, limit, remaining, reset_in)
+        metrics.gauge('rate_limit_remaining', remaining, provider=provider, window=name)
+        if remaining == 0:
+            exhausted = max(exhausted or 0.0, reset_in)
+
+    retry_after = headers.get('retry-after')
+    limited = status == 429 or (status == 403 and (retry_after is not None or exhausted is not None))
+    if not limited:
+        return 0.0
+
+    if retry_after is not None:
+        wait = parse_duration(retry_after)
+    elif exhausted is not None:
+        wait = exhausted
+    else:
+        wait = DEFAULT_BACKOFF
+    gov.block(wait)
+    metrics.count('rate_limited', provider=provider, status=status)
+    return wait or 1.0
+
+
+_buckets = {}
+_governors = {}
+_lock = threading.Lock()
+
+
+def bucket(provider):
+    with _lock:
+        if provider not in _buckets:
+            rate, capacity = DEFAULT_LIMITS.get(provider, (1.0, 1))
+            env = os.getenv(f"RATE_LIMIT_{provider.upper()}")
+            if env:
+                rate = float(env)
+            _buckets[provider] = TokenBucket(rate, capacity)
+        return _buckets[provider]
+
+
+def governor(provider):
+    with _lock:
+        if provider not in _governors:
+            _governors[provider] = Governor(provider)
+        return _governors[provider]
+
+
+def acquire(provider, tokens=1):
+    """Wait for the provider's reported limits, then for its bucket;
+    returns the seconds waited"""
+    return governor(provider).wait() + bucket(provider).acquire(tokens)
+
+
+def budget():
+    """Remaining budget per provider and window, as last reported"""
+    with _lock:
+        governors = list(_governors.items())
+    return {provider: gov.budget() for provider, gov in governors if gov.windows}
@@ -0,0 +1,233 @@
+"""HTML rendering for article pages and the homepage.
+
+Articles are converted with a small single-pass Markdown subset: **bold**,
+[links](url), paragraphs (single newlines become <br>) and bulleted or
+numbered lists. All text is HTML-escaped; only the markup produced here
+is emitted raw. Page templates and stylesheets live in ``templates/``
+and are read once per process.
+
+``SITE_OUTPUT=compact`` publishes smaller pages: the page stylesheets
+are merged into one fingerprinted ``assets/style.<hash>.css`` that every
+page links to (so browsers cache it across pages and it is uploaded only
+when it changes), and the HTML is minified. The default ``standalone``
+output inlines each page's styles.
+"""
+import hashlib
+import html
+import os
+import re
+from datetime import datetime
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+SITE_OUTPUT = os.getenv('SITE_OUTPUT', 'standalone').lower()
+STYLESHEETS = ('article.css', 'home.css')
+
+BOLD = re.compile(r'\*\*([^*\n]+)\*\*')
+# Only http(s), mailto and scheme-less URLs become links; anything else
+# (javascript:, data:, ...) is left as plain text
+LINK = re.compile(r'\[([^\]\n]+)\]\(((?:https?://|mailto:)[^)\s]*|[^):\s]+)\)', re.IGNORECASE)
+LIST_ITEM = re.compile(r'(?:(?P<bullet>[-*])|(?P<number>\d+)\.)\s+(?P<item>.*)')
+SCHEME = re.compile(r'^([a-z][a-z0-9+.-]*):', re.IGNORECASE)
+SAFE_SCHEMES = ('http', 'https', 'mailto')
+PLACEHOLDER = re.compile(r'\$([a-z_]+)')
+LIST_START = frozenset('-*0123456789')
+LIST_LINE = re.compile(r'^[ \t]*(?:[-*]|\d+\.)[ \t]', re.MULTILINE)
+BLANK_LINE = re.compile(r'\n[ \t]*\n')
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_SPACE = re.compile(r'\s*([{}:;,>])\s*')
+# Whitespace next to block-level tags never renders; anything else collapses
+# to a single space so spacing between inline elements survives
+BLOCK_TAG_SPACE = re.compile(
+    r'\s*(</?(?:html|head|meta|title|style|link|body|header|footer|div|nav|h[1-6]|p|ul|ol|li)\b[^>]*>)\s*')
+SPACE_RUN = re.compile(r'\s{2,}|\n')
+
+_sources = {}
+_templates = {}
+
+
+def load(name):
+    """Template or stylesheet from templates/, cached after the first read"""
+    text = _sources.get(name)
+    if text is None:
+        with open(os.path.join(TEMPLATE_DIR, name), 'r', encoding='utf-8') as f:
+            text = f.read()
+        _sources[name] = text
+    return text
+
+
+def template(name):
+    """Template compiled once into a str.format pattern ($name -> {name}),
+    minified up front in compact mode"""
+    key = f"{name}:{SITE_OUTPUT}"
+    compiled = _templates.get(key)
+    if compiled is None:
+        source = minify_html(load(name)) if compact() else load(name)
+        source = source.replace('{', '{{').replace('}', '}}')
+        compiled = _templates[key] = PLACEHOLDER.sub(r'{\1}', source)
+    return compiled
+
+
+def escape(text):
+    return html.escape(text, quote=True)
+
+
+def safe_url(url):
+    """Escaped URL, or '#' for schemes like javascript: that shouldn't be linked"""
+    url = escape(url.strip())
+    scheme = SCHEME.match(url)
+    if scheme and scheme.group(1).lower() not in SAFE_SCHEMES:
+        return '#'
+    return url
+
+
+# Plain callables expand much faster than re's backreference templates
+def _bold(match):
+    return '<strong>' + match[1] + '</strong>'
+
+
+def _link(match):
+    return '<a href="' + match[2] + '" target="_blank">' + match[1] + '</a>'
+
+
+def render_inline(escaped):
+    """Apply bold/link markup to text that is already HTML-escaped"""
+    if '**' in escaped:
+        escaped = BOLD.sub(_bold, escaped)
+    if '](' in escaped:
+        escaped = LINK.sub(_link, escaped)
+    return escaped
+
+
+def _render_block(block, out):
+    """Line-by-line rendering for a block that contains list items"""
+    paragraph = []
+    list_tag = None
+    for line in block.split('\n'):
+        line = line.strip()
+        item = LIST_ITEM.match(line) if line and line[0] in LIST_START else None
+        if paragraph and (item or not line):
+            out.append('<p>' + '<br>'.join(paragraph) + '</p>\n')
+            paragraph = []
+        if list_tag and not item:
+            out.append(f"</{list_tag}>\n")
+            list_tag = None
+        if not line:
+            continue
+        if item:
+            tag = 'ol' if item.group('number') else 'ul'
+            if tag != list_tag:
+                if list_tag:
+                    out.append(f"</{list_tag}>\n")
+                out.append(f"<{tag}>\n")
+                list_tag = tag
+            out.append('<li>' + item.group('item') + '</li>\n')
+        else:
+            paragraph.append(line)
+    if paragraph:
+        out.append('<p>' + '<br>'.join(paragraph) + '</p>\n')
+    if list_tag:
+        out.append(f"</{list_tag}>\n")
+
+
+def render_markdown(text):
+    """Render the Markdown subset to HTML in a single pass.
+
+    The whole text is escaped and given its inline markup up front (none
+    of the Markdown syntax characters are touched by escaping, and inline
+    markup never spans lines). Blocks without list items, the common case,
+    become paragraphs directly; only list blocks are walked line by line.
+    """
+    out = []
+    for block in BLANK_LINE.split(render_inline(escape(text))):
+        block = block.strip()
+        if not block:
+            continue
+        if LIST_LINE.search(block):
+            _render_block(block, out)
+        else:
+            out.append('<p>' + block.replace('\n', '<br>') + '</p>\n')
+    return ''.join(out)
+
+
+def split_title(article, fallback):
+    """Pull the "Title:" line out of a generated article; returns (title, body)"""
+    lines = article.split('\n')
+    for index, line in enumerate(lines):
+        if line.strip().startswith('Title:'):
+            title = line.replace('Title:', '').strip()
+            return title, '\n'.join(lines[index + 1:]).strip()
+    return fallback, article
+
+
+def compact():
+    return SITE_OUTPUT == 'compact'
+
+
+def minify_css(css):
+    css = CSS_COMMENT.sub('', css)
+    css = CSS_SPACE.sub(r'\1', css)
+    return ' '.join(css.split()).replace(';}', '}')
+
+
+def minify_html(page):
+    return BLOCK_TAG_SPACE.sub(r'\1', SPACE_RUN.sub(' ', page)).strip()
+
+
+def stylesheet():
+    """The shared compact-mode stylesheet; returns (path, css)
+
+    The path carries a hash of the content, so it can be cached forever
+    and a changed stylesheet gets a new URL.
+    """
+    cached = _sources.get('stylesheet')
+    if cached is None:
+        css = minify_css(''.join(load(name) for name in STYLESHEETS))
+        digest = hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]
+        cached = _sources['stylesheet'] = (f"assets/style.{digest}.css", css)
+    return cached
+
+
+def styles(name, blog_home='/'):
+    """The page's <style> block, or a <link> to the shared stylesheet in compact mode"""
+    key = f"{name}:{blog_home}" if compact() else f"{name}:inline"
+    block = _sources.get(key)
+    if block is None:
+        if compact():
+            href = escape(blog_home + stylesheet()[0])
+            block = f'<link rel="stylesheet" href="{href}">'
+        else:
+            block = f"    <style>\n{load(name)}    </style>"
+        _sources[key] = block
+    return block
+
+
+def render_article(article, tweet, blog_home, date=None):
+    """Render an article page; returns (title, html)"""
+    title, content = split_title(article, f"Article: {tweet['text'][:60]}")
+    content = render_markdown(content)
+    if compact():
+        # The only newlines render_markdown emits are its own, between tags
+        content = content.replace('\n', '')
+    date_str = (date or datetime.now()).strftime('%B %d, %Y')
+    page = template('article.html').format(
+        title=escape(title),
+        styles=styles('article.css', blog_home),
+        blog_home=escape(blog_home),
+        date_str=date_str,
+        content=content,
+        tweet_url=safe_url(tweet['url']),
+    )
+    return title, page
+
+
+def render_page(heading, articles_html, nav_html='', blog_home='/'):
+    """Render the homepage or an archive page around prebuilt list items"""
+    if compact():
+        articles_html, nav_html = minify_html(articles_html), minify_html(nav_html)
+    return template('home.html').format(
+        heading=escape(heading),
+        styles=styles('home.css', blog_home),
+        articles_html=articles_html,
+        nav_html=nav_html,
+    )
@@ -0,0 +1,90 @@
+"""Streaming parser for Nitter RSS timelines.
+
+Items are read with ``iterparse`` and cleared as soon as they have been
+looked at, so memory stays flat on large feeds and parsing can stop at
+the first already-processed tweet without reading the rest of the
+document. Known retweets and a known first item (a pinned tweet) are
+skipped rather than stopped at, since they aren't in timeline order. The match runs once on the raw title and description before
+any HTML is stripped, so non-matching items cost no cleanup work.
+"""
+import io
+import re
+import time
+from urllib.parse import urlsplit
+import xml.etree.ElementTree as ET
+
+TAG = re.compile(r'<[^>]+>')
+SPACE = re.compile(r'\s+')
+
+
+def iter_items(xml_content):
+    """Yield (title, description, link) for each <item> in document order"""
+    data = xml_content.encode('utf-8') if isinstance(xml_content, str) else xml_content
+    channel = None
+    for event, elem in ET.iterparse(io.BytesIO(data), events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'channel':
+                channel = elem
+            continue
+        if elem.tag != 'item':
+            continue
+        yield (
+            elem.findtext('title') or '',
+            elem.findtext('description') or '',
+            elem.findtext('link') or '',
+        )
+        elem.clear()
+        # Drop the finished items from the channel so they can be freed
+        if channel is not None:
+            channel.clear()
+
+
+def tweet_id_from_link(link):
+    return link.split('/')[-1].replace('#m', '') if link else str(int(time.time()))
+
+
+def author_from_link(link):
+    """The account in a ``https://host/<account>/status/<id>`` link"""
+    parts = urlsplit(link).path.split('/')
+    return parts[1] if len(parts) > 3 and parts[2] == 'status' else ''
+
+
+def clean_description(description):
+    return SPACE.sub(' ', TAG.sub(' ', description)).strip()
+
+
+def parse_items(xml_content, matches, username, is_known=None, saw=None):
+    """Collect matching tweets from a feed, newest first.
+
+    ``matches(text)`` returns a true value for a wanted item (a dict is
+    merged into the tweet as extra fields); ``is_known(id)``
+    stops parsing at the first already-seen tweet of ``username``'s own
+    (other known items are skipped) and ``saw(id)`` is called for every
+    new tweet ID. Returns (tweets, items scanned,
+    whether a known tweet was reached). Raises ``ET.ParseError``.
+    """
+    tweets = []
+    scanned = 0
+    for index, (title, description, link) in enumerate(iter_items(xml_content)):
+        scanned += 1
+        tweet_id = tweet_id_from_link(link)
+        if link and is_known and is_known(tweet_id):
+            # A pinned first item or a retweet can be older than what follows
+            if index > 0 and author_from_link(link).lower() == username.lower():
+                return tweets, scanned, True
+            continue
+        if link and saw:
+            saw(tweet_id)
+        fields = matches(f"{title}\n{description}")
+        if not fields:
+            continue
+        tweet = {
+            'id': tweet_id,
+            'text': title,
+            'quoted_text': clean_description(description)[:500],
+            'url': link or f"https://x.com/{username}/status/{tweet_id}"
+        }
+        if isinstance(fields, dict):
+            tweet.update(fields)
+        tweets.append(tweet)
+    return tweets, scanned, False
@@ -0,0 +1,141 @@
+"""Near-duplicate detection for tweets using 64-bit SimHash signatures.
+
+A tweet's ``text`` and ``quoted_text`` are normalized (lowercased, with
+hashtags, mentions, URLs and punctuation removed) and split into words.
+Each word votes on the 64 bits of its hash, and the sign of each bit's
+vote gives the signature. Texts that share most of their words end up
+within a few bits of each other; single words are used rather than
+longer shingles because tweets are short and a one-word edit would
+otherwise move the signature too far.
+
+Published articles are kept in a persistent index. Lookups split each
+signature into 8 bands of 8 bits, so only entries sharing at least one
+exact band are compared; with a Hamming threshold of 7 or less that
+still finds every match (pigeonhole).
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+
+INDEX_FILE = 'similarity_index.json'
+BITS = 64
+BANDS = 8
+BAND_BITS = BITS // BANDS
+MAX_DISTANCE = min(BANDS - 1, int(os.getenv('NEAR_DUPLICATE_DISTANCE', '6')))
+
+NOISE = re.compile(r'https?://\S+|[#@]\w+')
+NON_WORD = re.compile(r'[^a-z0-9\s]')
+
+
+def normalize(tweet):
+    text = f"{tweet.get('text', '')} {tweet.get('quoted_text', '')}".lower()
+    text = NOISE.sub(' ', text)
+    text = NON_WORD.sub(' ', text)
+    return text.split()
+
+
+def _hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def simhash(words):
+    if not words:
+        return None
+    votes = [0] * BITS
+    for word in words:
+        h = _hash(word)
+        for bit in range(BITS):
+            votes[bit] += 1 if h >> bit & 1 else -1
+    signature = 0
+    for bit in range(BITS):
+        if votes[bit] > 0:
+            signature |= 1 << bit
+    return signature
+
+
+def signature(tweet):
+    return simhash(normalize(tweet))
+
+
+def distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _bands(sig):
+    mask = (1 << BAND_BITS) - 1
+    return [f"{i}:{sig >> (i * BAND_BITS) & mask}" for i in range(BANDS)]
+
+
+class SimilarityIndex:
+    """SimHash index of published articles; ``path=None`` keeps it in memory"""
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = {}
+        if path:
+            try:
+                with open(path, 'r') as f:
+                    self.entries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+        self._buckets = {}
+        for key, entry in self.entries.items():
+            self._index(key, int(entry['signature'], 16))
+
+    def _index(self, key, sig):
+        for band in _bands(sig):
+            self._buckets.setdefault(band, []).append(key)
+
+    def find(self, tweet):
+        """Return the closest indexed entry within MAX_DISTANCE, or None"""
+        sig = signature(tweet)
+        if sig is None:
+            return None
+        best, best_distance = None, MAX_DISTANCE + 1
+        with self._lock:
+            candidates = set()
+            for band in _bands(sig):
+                candidates.update(self._buckets.get(band, ()))
+            for key in candidates:
+                entry = self.entries[key]
+                d = distance(sig, int(entry['signature'], 16))
+                if d < best_distance and key != str(tweet['id']):
+                    best, best_distance = dict(entry, id=key, distance=d), d
+        return best
+
+    def add(self, tweet, **info):
+        """Index a published tweet; ``info`` (e.g. article link) is stored with it"""
+        sig = signature(tweet)
+        if sig is None:
+            return
+        key = str(tweet['id'])
+        with self._lock:
+            if key not in self.entries:
+                self._index(key, sig)
+            self.entries[key] = dict(info, signature=f"{sig:016x}")
+            self._dirty = True
+
+    def add_duplicate(self, original_id, tweet_id):
+        """Record that ``tweet_id`` was skipped as a near-duplicate of ``original_id``"""
+        with self._lock:
+            entry = self.entries.get(str(original_id))
+            if entry is None:
+                return
+            duplicates = entry.setdefault('duplicates', [])
+            if str(tweet_id) not in duplicates:
+                duplicates.append(str(tweet_id))
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
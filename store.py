@@ -0,0 +1,139 @@
+"""Processed-tweet store.
+
+Processed IDs are kept in an append-only JSON-lines log (one record per
+line) and indexed in an in-memory set when the store is opened, so
+membership checks are O(1) and saving a batch is a single append instead
+of re-reading and rewriting the whole history.
+
+The old ``processed_tweets.json`` list is migrated into the log the first
+time a store is opened without one.
+"""
+import json
+import os
+from datetime import datetime
+
+LOG_FILE = 'processed_tweets.jsonl'
+LEGACY_FILE = 'processed_tweets.json'
+
+
+class ProcessedStore:
+    """Append-only log of processed tweet IDs with an in-memory index"""
+
+    def __init__(self, path=LOG_FILE, legacy_path=LEGACY_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._ids = set()
+        self._records = 0
+        if not os.path.exists(self.path) and legacy_path and os.path.exists(legacy_path):
+            self.migrate_legacy()
+        self._load()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, tweet_id):
+        return self.contains(tweet_id)
+
+    def _load(self):
+        self._ids = set()
+        self._records = 0
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from an interrupted append
+                        continue
+                    self._ids.add(str(record['id']))
+                    self._records += 1
+        except FileNotFoundError:
+            pass
+
+    def contains(self, tweet_id):
+        return str(tweet_id) in self._ids
+
+    def add_many(self, tweet_ids):
+        """Append every unseen ID in one write; returns how many were new"""
+        now = datetime.now().isoformat()
+        lines = []
+        for tweet_id in tweet_ids:
+            tweet_id = str(tweet_id)
+            if tweet_id in self._ids:
+                continue
+            self._ids.add(tweet_id)
+            lines.append(json.dumps({'id': tweet_id, 'processed_at': now}) + '\n')
+        if not lines:
+            return 0
+        with open(self.path, 'a') as f:
+            f.write(''.join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self._records += len(lines)
+        return len(lines)
+
+    def needs_compaction(self):
+        return self._records > len(self._ids)
+
+    def compact(self):
+        """Rewrite the log keeping the first record of each ID"""
+        seen = set()
+        records = []
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    tweet_id = str(record['id'])
+                    if tweet_id in seen:
+                        continue
+                    seen.add(tweet_id)
+                    records.append(record)
+        except FileNotFoundError:
+            return 0
+        self._write_records(records)
+        self._ids = seen
+        self._records = len(records)
+        return len(records)
+
+    def migrate_legacy(self):
+        """Import the old JSON list format into the append-only log"""
+        with open(self.legacy_path, 'r') as f:
+            data = json.load(f)
+        seen = set()
+        records = []
+        for entry in data:
+            if isinstance(entry, dict):
+                record = {'id': str(entry['id']), 'processed_at': entry.get('processed_at', '')}
+            else:
+                record = {'id': str(entry), 'processed_at': ''}
+            if record['id'] in seen:
+                continue
+            seen.add(record['id'])
+            records.append(record)
+        self._write_records(records)
+        return len(records)
+
+    def _write_records(self, records):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+if __name__ == "__main__":
+    store = ProcessedStore()
+    print(f"📋 {len(store)} processed tweets in {store.path}")
+    if store.needs_compaction():
+        print(f"🧹 Compacted to {store.compact()} records")
@@ -0,0 +1,136 @@
+"""Durable work queue for tweets moving through the pipeline.
+
+Each queued tweet records the last stage it completed and that stage's
+output, so a retry picks up where it failed instead of starting over:
+
+    fetched     -> research -> researched (sources)
+    researched  -> generate -> generated  (article)
+    generated   -> publish  -> removed from the queue
+
+A failed stage is retried on a later run after an exponential backoff
+(QUEUE_BACKOFF_HOURS, doubling per attempt, capped at a week); after
+QUEUE_MAX_ATTEMPTS failures the tweet moves to the dead-letter list,
+where it stays until retried by hand (``bot.py queue --retry``).
+"""
+import json
+import os
+import threading
+import time
+
+QUEUE_FILE = 'work_queue.json'
+MAX_ATTEMPTS = int(os.getenv('QUEUE_MAX_ATTEMPTS', '5'))
+BACKOFF = float(os.getenv('QUEUE_BACKOFF_HOURS', '1')) * 3600
+MAX_BACKOFF = 7 * 86400
+
+FETCHED = 'fetched'
+RESEARCHED = 'researched'
+GENERATED = 'generated'
+
+
+def backoff(attempts):
+    return min(MAX_BACKOFF, BACKOFF * 2 ** (attempts - 1))
+
+
+class WorkQueue:
+    def __init__(self, path=QUEUE_FILE, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        self.items = data.get('items', {})
+        self.dead = data.get('dead', {})
+
+    def __len__(self):
+        return len(self.items)
+
+    def known(self, tweet_id):
+        """Queued or dead-lettered; either way fetching shouldn't add it again"""
+        tweet_id = str(tweet_id)
+        return tweet_id in self.items or tweet_id in self.dead
+
+    def get(self, tweet_id):
+        return self.items.get(str(tweet_id))
+
+    def enqueue(self, tweet):
+        with self._lock:
+            if self.known(tweet['id']):
+                return False
+            self.items[str(tweet['id'])] = {
+                'tweet': tweet,
+                'stage': FETCHED,
+                'attempts': 0,
+                'next_attempt': 0,
+                'enqueued': time.time(),
+            }
+            self._dirty = True
+            return True
+
+    def due(self, now=None):
+        """Tweets ready to (re)try, oldest first"""
+        now = time.time() if now is None else now
+        with self._lock:
+            ready = [item for item in self.items.values() if item['next_attempt'] <= now]
+        ready.sort(key=lambda item: item['enqueued'])
+        return [item['tweet'] for item in ready]
+
+    def advance(self, tweet_id, stage, **artifacts):
+        """Record a completed stage and its output"""
+        with self._lock:
+            item = self.items.get(str(tweet_id))
+            if item is None:
+                return
+            item['stage'] = stage
+            item.update(artifacts)
+            self._dirty = True
+
+    def fail(self, tweet_id, stage, error):
+        """Schedule a retry of ``stage``; returns True if the tweet was dead-lettered"""
+        with self._lock:
+            item = self.items.get(str(tweet_id))
+            if item is None:
+                return False
+            item['attempts'] += 1
+            item['last_error'] = f"{stage}: {str(error)[:200]}"
+            self._dirty = True
+            if item['attempts'] >= self.max_attempts:
+                item['dead_at'] = time.time()
+                self.dead[str(tweet_id)] = self.items.pop(str(tweet_id))
+                return True
+            item['next_attempt'] = time.time() + backoff(item['attempts'])
+            return False
+
+    def complete(self, tweet_id):
+        with self._lock:
+            if self.items.pop(str(tweet_id), None) is not None:
+                self._dirty = True
+
+    def retry(self, tweet_ids=None):
+        """Move dead-lettered tweets (all if ``tweet_ids`` is None) back into
+        the queue, keeping their artifacts; returns how many moved"""
+        with self._lock:
+            ids = list(self.dead) if tweet_ids is None else [str(i) for i in tweet_ids if str(i) in self.dead]
+            for tweet_id in ids:
+                item = self.dead.pop(tweet_id)
+                item.pop('dead_at', None)
+                item['attempts'] = 0
+                item['next_attempt'] = 0
+                self.items[tweet_id] = item
+            if ids:
+                self._dirty = True
+            return len(ids)
+
+    def save(self):
+        with self._lock:
+            # Always leave a file behind so the workflow can commit it
+            if not self._dirty and os.path.exists(self.path):
+                return
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'items': self.items, 'dead': self.dead}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self._dirty = False